@@ -0,0 +1,514 @@
+/*
+ * Accelerator for raw_json.py: writes selected fields of the documents in
+ * a raw cursor batch straight to JSON objects, without building a dict or
+ * any other Python object per document.
+ *
+ * The output matches serializer.dumps of the same fields: compact, UTF-8,
+ * datetimes as datetime.isoformat() of the naive UTC value, ObjectIds as
+ * hex strings. Conversion stops at a document holding a value it has no
+ * exact equivalent for (doubles, embedded documents, arrays, ...) or that
+ * is malformed, and the caller decodes that one the usual way.
+ *
+ * Built by scripts/build_extensions.py.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+#include <string.h>
+
+#define MAX_FIELDS 32
+#define STACK_BUFFER 2048
+
+typedef struct {
+    char *data;
+    Py_ssize_t len;
+    Py_ssize_t cap;
+    char stack[STACK_BUFFER];
+} buffer_t;
+
+static int reserve(buffer_t *out, Py_ssize_t extra) {
+    Py_ssize_t cap;
+    char *data;
+
+    if (out->len + extra <= out->cap) {
+        return 0;
+    }
+    cap = out->cap * 2;
+    while (cap < out->len + extra) {
+        cap *= 2;
+    }
+    if (out->data == out->stack) {
+        data = PyMem_Malloc(cap);
+        if (data != NULL) {
+            memcpy(data, out->stack, out->len);
+        }
+    } else {
+        data = PyMem_Realloc(out->data, cap);
+    }
+    if (data == NULL) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    out->data = data;
+    out->cap = cap;
+    return 0;
+}
+
+static int write_bytes(buffer_t *out, const char *bytes, Py_ssize_t len) {
+    if (reserve(out, len) < 0) {
+        return -1;
+    }
+    memcpy(out->data + out->len, bytes, len);
+    out->len += len;
+    return 0;
+}
+
+static int32_t read_int32(const unsigned char *p) {
+    return (int32_t)((uint32_t)p[0] | ((uint32_t)p[1] << 8) |
+                     ((uint32_t)p[2] << 16) | ((uint32_t)p[3] << 24));
+}
+
+static int64_t read_int64(const unsigned char *p) {
+    return (int64_t)((uint64_t)(uint32_t)read_int32(p) |
+                     ((uint64_t)(uint32_t)read_int32(p + 4) << 32));
+}
+
+/*
+ * What write_string does with each byte: 0 copies it, 1 escapes it (control
+ * characters, '"' and '\\', as json.dumps(ensure_ascii=False) does), 2 starts
+ * a multi-byte UTF-8 sequence to validate.
+ */
+static const unsigned char BYTE_CLASS[256] = {
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
+    0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2,
+    2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2,
+    2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2,
+    2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2,
+    2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2,
+    2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2,
+    2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2,
+    2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2,
+};
+
+#define CONTINUATION(c) (((c) & 0xC0) == 0x80)
+
+/*
+ * Length of the UTF-8 sequence at s (len bytes available), or 0 if it is
+ * one Python's strict decoder rejects: stray continuation bytes, overlong
+ * forms, surrogates, code points above U+10FFFF, truncation.
+ */
+static Py_ssize_t utf8_sequence(const unsigned char *s, Py_ssize_t len) {
+    unsigned char c = s[0];
+
+    if (c < 0xC2) {
+        return 0;
+    }
+    if (c < 0xE0) {
+        return len >= 2 && CONTINUATION(s[1]) ? 2 : 0;
+    }
+    if (c < 0xF0) {
+        if (len < 3 || !CONTINUATION(s[1]) || !CONTINUATION(s[2])) return 0;
+        if ((c == 0xE0 && s[1] < 0xA0) || (c == 0xED && s[1] >= 0xA0)) return 0;
+        return 3;
+    }
+    if (c < 0xF5) {
+        if (len < 4 || !CONTINUATION(s[1]) || !CONTINUATION(s[2]) || !CONTINUATION(s[3])) return 0;
+        if ((c == 0xF0 && s[1] < 0x90) || (c == 0xF4 && s[1] >= 0x90)) return 0;
+        return 4;
+    }
+    return 0;
+}
+
+/* JSON string, escaped like json.dumps(ensure_ascii=False). 0 if s is not valid UTF-8. */
+static int write_string(buffer_t *out, const unsigned char *s, Py_ssize_t len) {
+    static const char hex[] = "0123456789abcdef";
+    Py_ssize_t i = 0, start = 0, sequence;
+    char escape[6] = {'\\', 'u', '0', '0', 0, 0};
+
+    /* Worst case: every byte becomes \u00XX. */
+    if (reserve(out, len * 6 + 2) < 0) {
+        return -1;
+    }
+    out->data[out->len++] = '"';
+    while (i < len) {
+        unsigned char c = s[i];
+        const char *replacement;
+        Py_ssize_t replacement_len = 2;
+
+        switch (BYTE_CLASS[c]) {
+        case 0:
+            i++;
+            continue;
+        case 2:
+            sequence = utf8_sequence(s + i, len - i);
+            if (sequence == 0) {
+                return 0;
+            }
+            i += sequence;
+            continue;
+        }
+        switch (c) {
+        case '"': replacement = "\\\""; break;
+        case '\\': replacement = "\\\\"; break;
+        case '\n': replacement = "\\n"; break;
+        case '\r': replacement = "\\r"; break;
+        case '\t': replacement = "\\t"; break;
+        case '\b': replacement = "\\b"; break;
+        case '\f': replacement = "\\f"; break;
+        default:
+            escape[4] = hex[c >> 4];
+            escape[5] = hex[c & 0xf];
+            replacement = escape;
+            replacement_len = 6;
+        }
+        memcpy(out->data + out->len, s + start, i - start);
+        out->len += i - start;
+        memcpy(out->data + out->len, replacement, replacement_len);
+        out->len += replacement_len;
+        start = ++i;
+    }
+    memcpy(out->data + out->len, s + start, len - start);
+    out->len += len - start;
+    out->data[out->len++] = '"';
+    return 1;
+}
+
+static int64_t floor_div(int64_t a, int64_t b) {
+    return a / b - (a % b != 0 && (a < 0) != (b < 0));
+}
+
+static char *write_digits(char *p, int value, int width) {
+    int i;
+
+    for (i = width - 1; i >= 0; i--) {
+        p[i] = (char)('0' + value % 10);
+        value /= 10;
+    }
+    return p + width;
+}
+
+/* Returns 1 when written, 0 when the date is outside datetime's range. */
+static int write_datetime(buffer_t *out, int64_t millis) {
+    char text[32], *p = text;
+    int64_t seconds = floor_div(millis, 1000);
+    int ms = (int)(millis - seconds * 1000);
+    int64_t days = floor_div(seconds, 86400);
+    int64_t second_of_day = seconds - days * 86400;
+    /* Civil date from days since 1970-01-01 (proleptic Gregorian). */
+    int64_t z = days + 719468;
+    int64_t era = floor_div(z, 146097);
+    int64_t day_of_era = z - era * 146097;
+    int64_t year_of_era = (day_of_era - day_of_era / 1460 + day_of_era / 36524 - day_of_era / 146096) / 365;
+    int64_t day_of_year = day_of_era - (365 * year_of_era + year_of_era / 4 - year_of_era / 100);
+    int64_t mp = (5 * day_of_year + 2) / 153;
+    int day = (int)(day_of_year - (153 * mp + 2) / 5 + 1);
+    int month = (int)(mp < 10 ? mp + 3 : mp - 9);
+    int64_t year = year_of_era + era * 400 + (month <= 2);
+
+    if (year < 1 || year > 9999) {
+        return 0;
+    }
+    /* "YYYY-MM-DDTHH:MM:SS[.ffffff]", as datetime.isoformat() writes it */
+    *p++ = '"';
+    p = write_digits(p, (int)year, 4);
+    *p++ = '-';
+    p = write_digits(p, month, 2);
+    *p++ = '-';
+    p = write_digits(p, day, 2);
+    *p++ = 'T';
+    p = write_digits(p, (int)(second_of_day / 3600), 2);
+    *p++ = ':';
+    p = write_digits(p, (int)(second_of_day / 60 % 60), 2);
+    *p++ = ':';
+    p = write_digits(p, (int)(second_of_day % 60), 2);
+    if (ms) {
+        *p++ = '.';
+        p = write_digits(p, ms, 3);
+        memcpy(p, "000", 3);
+        p += 3;
+    }
+    *p++ = '"';
+    return write_bytes(out, text, p - text) < 0 ? -1 : 1;
+}
+
+static int write_object_id(buffer_t *out, const unsigned char *oid) {
+    static const char hex[] = "0123456789abcdef";
+    char text[26];
+    int i;
+
+    text[0] = '"';
+    for (i = 0; i < 12; i++) {
+        text[1 + 2 * i] = hex[oid[i] >> 4];
+        text[2 + 2 * i] = hex[oid[i] & 0xf];
+    }
+    text[25] = '"';
+    return write_bytes(out, text, 26);
+}
+
+/* Size of the value of a BSON element, or -1 if it is malformed or of an unknown type. */
+static Py_ssize_t value_size(unsigned char type, const unsigned char *value, Py_ssize_t available) {
+    Py_ssize_t size;
+    const unsigned char *end;
+
+    switch (type) {
+    case 0x01: case 0x09: case 0x11: case 0x12: size = 8; break;
+    case 0x07: size = 12; break;
+    case 0x08: size = 1; break;
+    case 0x0A: case 0x06: case 0x7F: case 0xFF: size = 0; break;
+    case 0x10: size = 4; break;
+    case 0x13: size = 16; break;
+    case 0x02: case 0x0D: case 0x0E:
+        if (available < 4) return -1;
+        size = read_int32(value);
+        if (size < 1 || size > available - 4 || value[4 + size - 1] != 0) return -1;
+        size += 4;
+        break;
+    case 0x03: case 0x04: case 0x0F:
+        if (available < 4) return -1;
+        size = read_int32(value);
+        if (size < 5) return -1;
+        break;
+    case 0x05:
+        if (available < 4) return -1;
+        size = read_int32(value);
+        if (size < 0 || size > available - 5) return -1;
+        size += 5;
+        break;
+    case 0x0B:
+        end = memchr(value, 0, available);
+        if (end == NULL) return -1;
+        end = memchr(end + 1, 0, available - (end + 1 - value));
+        if (end == NULL) return -1;
+        size = end + 1 - value;
+        break;
+    default:
+        return -1;
+    }
+    return size <= available ? size : -1;
+}
+
+typedef struct {
+    unsigned char type;
+    const unsigned char *value;
+    Py_ssize_t size;
+} slot_t;
+
+/* 1 when written, 0 when the value has no exact serializer.dumps equivalent here. */
+static int write_value(buffer_t *out, const slot_t *slot) {
+    char number[24];
+    int len;
+
+    switch (slot->type) {
+    case 0x02:
+        return write_string(out, slot->value + 4, slot->size - 5);
+    case 0x09:
+        return write_datetime(out, read_int64(slot->value));
+    case 0x07:
+        return write_object_id(out, slot->value) < 0 ? -1 : 1;
+    case 0x10:
+        len = snprintf(number, sizeof(number), "%d", (int)read_int32(slot->value));
+        return write_bytes(out, number, len) < 0 ? -1 : 1;
+    case 0x12:
+        len = snprintf(number, sizeof(number), "%lld", (long long)read_int64(slot->value));
+        return write_bytes(out, number, len) < 0 ? -1 : 1;
+    case 0x08:
+        if (slot->value[0] > 1) return 0;
+        return write_bytes(out, slot->value[0] ? "true" : "false", slot->value[0] ? 4 : 5) < 0 ? -1 : 1;
+    case 0x0A:
+        return write_bytes(out, "null", 4) < 0 ? -1 : 1;
+    default:
+        return 0;
+    }
+}
+
+typedef struct {
+    const char *names[MAX_FIELDS];
+    Py_ssize_t lengths[MAX_FIELDS];
+    Py_ssize_t count;
+} fields_t;
+
+/*
+ * Append one document as a JSON object. Returns 1 when written, 0 when the
+ * document needs the Python path (out is left as it was), -1 on error.
+ */
+static int write_document(buffer_t *out, const unsigned char *data, Py_ssize_t len,
+                          const fields_t *fields) {
+    slot_t slots[MAX_FIELDS];
+    Py_ssize_t i, pos = 4, end = len - 1, rewind = out->len;
+    int first = 1, written;
+
+    if (len < 5 || read_int32(data) != len || data[end] != 0) {
+        return 0;
+    }
+    for (i = 0; i < fields->count; i++) {
+        slots[i].type = 0;
+    }
+
+    /* One pass over the elements, remembering where the wanted fields are. */
+    while (pos < end) {
+        unsigned char type = data[pos++];
+        const unsigned char *key = data + pos;
+        const unsigned char *key_end = memchr(key, 0, end - pos);
+        Py_ssize_t key_length, size;
+
+        if (key_end == NULL) {
+            return 0;
+        }
+        key_length = key_end - key;
+        pos += key_length + 1;
+        size = value_size(type, data + pos, end - pos);
+        if (size < 0) {
+            return 0;
+        }
+        for (i = 0; i < fields->count; i++) {
+            if (fields->lengths[i] == key_length && memcmp(fields->names[i], key, key_length) == 0) {
+                slots[i].type = type;
+                slots[i].value = data + pos;
+                slots[i].size = size;
+                break;
+            }
+        }
+        pos += size;
+    }
+    if (pos != end) {
+        return 0;
+    }
+
+    /* Emit them in the order they were asked for, like serialize_task. */
+    if (write_bytes(out, "{", 1) < 0) {
+        return -1;
+    }
+    for (i = 0; i < fields->count; i++) {
+        if (slots[i].type == 0) {
+            continue;
+        }
+        if (reserve(out, fields->lengths[i] + 4) < 0) {
+            return -1;
+        }
+        if (!first) {
+            out->data[out->len++] = ',';
+        }
+        first = 0;
+        out->data[out->len++] = '"';
+        memcpy(out->data + out->len, fields->names[i], fields->lengths[i]);
+        out->len += fields->lengths[i];
+        out->data[out->len++] = '"';
+        out->data[out->len++] = ':';
+        written = write_value(out, &slots[i]);
+        if (written <= 0) {
+            out->len = rewind;
+            return written;
+        }
+    }
+    if (write_bytes(out, "}", 1) < 0) {
+        return -1;
+    }
+    return 1;
+}
+
+static PyObject *documents_to_json(PyObject *self, PyObject *const *args, Py_ssize_t nargs) {
+    Py_buffer view;
+    PyObject *text, *result = NULL;
+    fields_t fields;
+    Py_ssize_t i, position, limit, count = 0, last = -1;
+    buffer_t out;
+    const unsigned char *data;
+
+    if (nargs != 4) {
+        PyErr_SetString(PyExc_TypeError, "documents_to_json takes exactly 4 arguments");
+        return NULL;
+    }
+    if (!PyTuple_Check(args[1]) || PyTuple_GET_SIZE(args[1]) > MAX_FIELDS) {
+        PyErr_Format(PyExc_TypeError, "fields must be a tuple of at most %d bytes", MAX_FIELDS);
+        return NULL;
+    }
+    fields.count = PyTuple_GET_SIZE(args[1]);
+    for (i = 0; i < fields.count; i++) {
+        PyObject *name = PyTuple_GET_ITEM(args[1], i);
+        if (!PyBytes_Check(name)) {
+            PyErr_Format(PyExc_TypeError, "fields must be a tuple of at most %d bytes", MAX_FIELDS);
+            return NULL;
+        }
+        fields.names[i] = PyBytes_AS_STRING(name);
+        fields.lengths[i] = PyBytes_GET_SIZE(name);
+    }
+    position = PyLong_AsSsize_t(args[2]);
+    limit = PyLong_AsSsize_t(args[3]);
+    if ((position == -1 || limit == -1) && PyErr_Occurred()) {
+        return NULL;
+    }
+    if (PyObject_GetBuffer(args[0], &view, PyBUF_SIMPLE) < 0) {
+        return NULL;
+    }
+    out.data = out.stack;
+    out.len = 0;
+    out.cap = STACK_BUFFER;
+    if (position < 0 || position > view.len) {
+        PyErr_SetString(PyExc_ValueError, "position is outside the batch");
+        goto done;
+    }
+
+    data = view.buf;
+    while (count < limit && view.len - position >= 4) {
+        Py_ssize_t size = read_int32(data + position);
+        Py_ssize_t rewind = out.len;
+        int written;
+
+        if (size < 5 || size > view.len - position) {
+            break;
+        }
+        if (count && write_bytes(&out, ",", 1) < 0) {
+            goto done;
+        }
+        written = write_document(&out, data + position, size, &fields);
+        if (written < 0) {
+            goto done;
+        }
+        if (written == 0) {
+            out.len = rewind;
+            break;
+        }
+        last = position;
+        position += size;
+        count++;
+    }
+
+    /* Valid UTF-8: strings were checked as they were copied. */
+    text = PyUnicode_DecodeUTF8(out.data, out.len, "strict");
+    if (text != NULL) {
+        result = Py_BuildValue("(Nnnn)", text, count, position, last);
+    }
+
+done:
+    if (out.data != out.stack) {
+        PyMem_Free(out.data);
+    }
+    PyBuffer_Release(&view);
+    return result;
+}
+
+static PyMethodDef raw_json_methods[] = {
+    {"documents_to_json", (PyCFunction)(void (*)(void))documents_to_json, METH_FASTCALL,
+     "documents_to_json(batch, fields, position, limit) -> (text, count, position, last)\n\n"
+     "Convert up to limit documents of a raw batch, starting at byte position, to\n"
+     "JSON objects of the given fields (a tuple of UTF-8 bytes) joined by commas.\n"
+     "Stops early at a document that needs the Python path. Returns the text, the\n"
+     "number of documents converted, the position after them and the position of\n"
+     "the last one (-1 if none)."},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef raw_json_module = {
+    PyModuleDef_HEAD_INIT, "_raw_json", NULL, -1, raw_json_methods
+};
+
+PyMODINIT_FUNC PyInit__raw_json(void) {
+    return PyModule_Create(&raw_json_module);
+}
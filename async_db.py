@@ -0,0 +1,44 @@
+"""AsyncMongoClient and collections for async_handler.py.
+
+The async counterpart of db.py, with the same connection settings (see
+mongo_settings.py). One process serves many requests at once on its event
+loop, so the pool defaults to the driver's usual 100 connections rather
+than one. The client belongs to the event loop it is first used on.
+Indexes are declared and created by db.py (run `python db.py` once for a
+deployment that only uses this module).
+"""
+import asyncio
+import time
+
+from pymongo import AsyncMongoClient
+from pymongo.errors import PyMongoError
+
+import metrics
+from mongo_settings import MONGO_URI, CommandTimer, cache_srv_lookups, client_options
+
+# Requests one process works on at once, and so its pool size.
+MAX_POOL_SIZE = 100
+
+cache_srv_lookups(MONGO_URI)
+client = AsyncMongoClient(
+    MONGO_URI, event_listeners=[CommandTimer()], **client_options(MONGO_URI, MAX_POOL_SIZE)
+)
+db = client.get_database("task-manager")
+tasks_collection = db.get_collection("tasks")
+users_collection = db.get_collection("users")
+
+async def prewarm():
+    """Open the pool's minPoolSize connections now, rather than on a request.
+
+    Like db.prewarm, with the pings run concurrently on the event loop.
+    Returns whether the server was reached.
+    """
+    connections = max(client.options.pool_options.min_pool_size, 1)
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(connections)))
+    except PyMongoError as e:
+        metrics.log_error("Error connecting to MongoDB", e)
+        return False
+    metrics.log("info", "Mongo prewarm", connections=connections, ms=round((time.perf_counter() - start) * 1000, 1))
+    return True
@@ -0,0 +1,354 @@
+"""asyncio variant of lambda_function.py, on pymongo's AsyncMongoClient.
+
+Serves lambda_function.py's route declaration (ROUTES, bound here to the
+coroutines of the same names), with its middleware, and uses its helpers
+for validation, queries and responses; only the I/O differs, the handlers
+here awaiting MongoDB through async_db.py. While one request waits on
+Mongo the event loop works on the others, and scrypt runs in a worker
+thread so a login does not hold them up.
+
+Two entry points:
+
+    lambda_handler(event, context)   for the Lambda runtime (handler
+        async_handler.lambda_handler). Every invocation runs on the one
+        event loop the container keeps, which the client is bound to.
+    app(scope, receive, send)        an ASGI application, for container
+        deployments: scripts/asgi_server.py locally, or any ASGI server.
+"""
+import asyncio
+import base64
+import os
+import uuid
+from datetime import datetime
+from urllib.parse import parse_qsl
+
+import metrics
+import responses
+import task_cache
+from lambda_function import (
+    RESOURCES,
+    ROUTES,
+    batch_response,
+    cache_tasks,
+    cached_tasks,
+    encode_tasks,
+    existing_tasks_query,
+    hash_password,
+    invalidate_tasks,
+    issue_token,
+    password_needs_rehash,
+    plan_batch,
+    serialize_task,
+    skip_hint,
+    skip_missing,
+    task_cache_blocks,
+    task_cursor,
+    task_filter,
+    task_hint,
+    task_page,
+    task_to_insert,
+    task_update,
+    tasks_response,
+    verify_password,
+)
+from router import bind_routes, compile_routes, dispatch_async, resource_for
+
+# The event loop lambda_handler runs every invocation on; app runs on the
+# ASGI server's loop instead.
+_loop = None
+
+def event_loop():
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+    return _loop
+
+# As in lambda_function.py, off unless set to on.
+MONGO_PREWARM = os.getenv("MONGO_PREWARM", "off") == "on"
+if MONGO_PREWARM:
+    import async_db
+    event_loop().run_until_complete(async_db.prewarm())
+
+# app answers GET HEALTH_PATH itself, without touching MongoDB, for load
+# balancer and orchestrator health checks.
+HEALTH_PATH = "/health"
+# Largest request body app accepts, in bytes (413 past it): Lambda's
+# invocation payload limit, so both entry points take the same requests.
+MAX_BODY_SIZE = int(os.getenv("MAX_BODY_SIZE", str(6 * 1024 * 1024)))
+
+# True until this process has served its first request.
+_cold_start = True
+
+def lambda_handler(event, context):
+    return event_loop().run_until_complete(handle(event, context))
+
+async def handle(event, context):
+    """lambda_function.lambda_handler, for the event loop"""
+    global _cold_start
+    http_method = event.get("httpMethod")
+    path = event.get("resource") or event.get("path") or ""
+    resource = resource_for(path, RESOURCES, "/tasks")
+    invocation = metrics.start_invocation(
+        route=f"{http_method} {resource}",
+        request_id=getattr(context, "aws_request_id", None)
+            or (event.get("requestContext") or {}).get("requestId")
+    )
+
+    response = None
+    try:
+        response = await dispatch_async(ROUTE_TABLE, http_method, resource, event) or responses.UNSUPPORTED_METHOD
+        return response
+    finally:
+        # An exception escaping the handler reaches the client as a 502.
+        metrics.emit(
+            invocation,
+            status=response["statusCode"] if response else 502,
+            bytes_in=metrics.utf8_length(event.get("body")),
+            bytes_out=metrics.utf8_length(response.get("body")) if response else 0,
+            cold=_cold_start
+        )
+        _cold_start = False
+
+async def preflight():
+    return responses.PREFLIGHT
+
+async def register(body):
+    from pymongo.errors import DuplicateKeyError
+    from async_db import users_collection
+
+    user_data = {
+        "email": body["email"],
+        "password": await asyncio.to_thread(hash_password, body["password"]),
+        "created_at": datetime.utcnow()
+    }
+
+    # The email_unique index rejects duplicates, so there is no lookup first.
+    try:
+        result = await users_collection.insert_one(user_data)
+    except DuplicateKeyError:
+        return responses.EMAIL_REGISTERED
+
+    token = issue_token(str(result.inserted_id))
+    return responses.json_response(201, {"message": "User registered successfully", "token": token})
+
+async def login(body):
+    from async_db import users_collection
+
+    password = body["password"]
+    user = await users_collection.find_one({"email": body["email"]})
+    if not user:
+        return responses.INVALID_CREDENTIALS
+
+    if not await asyncio.to_thread(verify_password, password, user["password"]):
+        return responses.INVALID_CREDENTIALS
+
+    if password_needs_rehash(user["password"]):
+        await users_collection.update_one(
+            {"_id": user["_id"]},
+            {"$set": {"password": await asyncio.to_thread(hash_password, password)}}
+        )
+
+    token = issue_token(str(user["_id"]))
+    return responses.json_response(200, {"message": "Login successful", "token": token})
+
+async def get_tasks(event, user_id):
+    from pymongo.errors import OperationFailure
+    from async_db import tasks_collection
+
+    page, error = task_page(event, user_id)
+    if error:
+        return error
+
+    cache_key = task_cache.page_key(event.get("queryStringParameters"))
+    cached, generation = await in_cache(cached_tasks, user_id, cache_key)
+    if cached:
+        return tasks_response(*cached)
+
+    hint = task_hint(page)
+    try:
+        try:
+            batches = await fetch_batches(task_cursor(tasks_collection, page, hint))
+        except OperationFailure as e:
+            if hint is None:
+                raise
+            metrics.log_error("Error fetching tasks with index hint, retrying without it", e, hint=hint)
+            batches = await fetch_batches(task_cursor(tasks_collection, page, None))
+            skip_hint(hint)
+        encoded = encode_tasks(batches, page["fields"], page["sort_field"], page["limit"])
+    except Exception as e:
+        metrics.log_error("Error fetching tasks", e)
+        return responses.FETCH_TASKS_FAILED
+    await in_cache(cache_tasks, user_id, cache_key, generation, encoded)
+    return tasks_response(*encoded)
+
+async def fetch_batches(cursor):
+    """All of a page's raw BSON batches, closing the cursor.
+
+    A page is at most MAX_PAGE_SIZE + 1 tasks, a few batches, so they are
+    all fetched before encoding.
+    """
+    try:
+        return [batch async for batch in cursor]
+    finally:
+        await cursor.close()
+
+async def add_task(body, user_id):
+    from pymongo.errors import DuplicateKeyError
+    from async_db import tasks_collection
+
+    task, error = task_to_insert(body, user_id)
+    if error:
+        return error
+
+    try:
+        await tasks_collection.insert_one(task)
+        await in_cache(invalidate_tasks, user_id)
+
+        return responses.json_response(201, serialize_task(task))
+    except DuplicateKeyError:
+        return responses.TASK_ID_EXISTS
+    except Exception as e:
+        metrics.log_error("Error adding task", e)
+        return responses.ADD_TASK_FAILED
+
+async def update_task(body, user_id):
+    from async_db import tasks_collection
+
+    update, error = task_update(body, user_id)
+    if error:
+        return error
+
+    result = await tasks_collection.update_one(*update)
+
+    if result.matched_count > 0:
+        await in_cache(invalidate_tasks, user_id)
+        return responses.TASK_UPDATED
+    else:
+        return responses.TASK_NOT_FOUND
+
+async def delete_task(body, user_id):
+    from async_db import tasks_collection
+
+    result = await tasks_collection.delete_one(task_filter(body, user_id))
+
+    if result.deleted_count > 0:
+        await in_cache(invalidate_tasks, user_id)
+        return responses.TASK_DELETED
+    else:
+        return responses.TASK_NOT_FOUND
+
+async def batch_tasks(body, user_id):
+    """lambda_function.batch_tasks: still one bulk_write, which is one round trip"""
+    from pymongo.errors import BulkWriteError
+    from async_db import tasks_collection
+
+    batch, error = plan_batch(body, user_id)
+    if error:
+        return error
+
+    query = existing_tasks_query(batch, user_id)
+    if query:
+        try:
+            skip_missing(batch, [task["id"] async for task in tasks_collection.find(query, {"_id": 0, "id": 1})])
+        except Exception as e:
+            metrics.log_error("Error applying batch", e)
+            return responses.BATCH_FAILED
+
+    details = None
+    if batch["requests"]:
+        try:
+            result = await tasks_collection.bulk_write(batch["requests"], ordered=batch["ordered"])
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+        except Exception as e:
+            metrics.log_error("Error applying batch", e)
+            return responses.BATCH_FAILED
+        finally:
+            await in_cache(invalidate_tasks, user_id)
+    return batch_response(batch, details)
+
+async def in_cache(function, *args):
+    """Call one of lambda_function's task cache functions, in a worker
+    thread when it waits on a shared store"""
+    if task_cache_blocks():
+        return await asyncio.to_thread(function, *args)
+    return function(*args)
+
+async def app(scope, receive, send):
+    """ASGI application serving the same routes as lambda_handler"""
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    response = None
+    if scope["method"] == "GET" and scope["path"] == HEALTH_PATH:
+        response = responses.HEALTHY
+    body = b""
+    while response is None:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY_SIZE:
+            response = responses.BODY_TOO_LARGE
+        elif not message.get("more_body"):
+            break
+
+    if response is None:
+        try:
+            response = await handle(proxy_event(scope, body), None)
+        except Exception as e:
+            metrics.log_error("Unhandled error in handle", e, route=f"{scope['method']} {scope['path']}")
+            response = {"statusCode": 502, "headers": {}, "body": '{"message":"Internal server error"}'}
+
+    payload = (response.get("body") or "").encode("utf-8")
+    headers = [
+        (name.encode("latin-1"), str(value).encode("latin-1"))
+        for name, value in (response.get("headers") or {}).items()
+    ]
+    headers.append((b"content-length", str(len(payload)).encode("latin-1")))
+    await send({"type": "http.response.start", "status": response["statusCode"], "headers": headers})
+    await send({"type": "http.response.body", "body": payload})
+
+async def lifespan(receive, send):
+    """Open the Mongo connections on startup and close them on shutdown"""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            import async_db
+            await async_db.prewarm()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            import async_db
+            await async_db.client.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+def proxy_event(scope, body: bytes) -> dict:
+    """Build the API Gateway proxy event for one ASGI HTTP request"""
+    headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+    query = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+    # Like API Gateway, pass a body that is not UTF-8 text base64-encoded.
+    try:
+        text, is_base64 = body.decode("utf-8"), False
+    except UnicodeDecodeError:
+        text, is_base64 = base64.b64encode(body).decode("ascii"), True
+    return {
+        "httpMethod": scope["method"],
+        "path": scope["path"],
+        "headers": headers,
+        "queryStringParameters": dict(query) or None,
+        "body": text or None,
+        "isBase64Encoded": is_base64,
+        "requestContext": {
+            "requestId": str(uuid.uuid4()),
+            "httpMethod": scope["method"],
+            "path": scope["path"],
+        },
+    }
+
+# lambda_function's route declaration, bound to the coroutines here.
+ROUTE_TABLE = compile_routes(bind_routes(ROUTES, globals()))
@@ -0,0 +1,106 @@
+"""BSON and OP_MSG codec throughput: C extensions vs pure Python.
+
+Encodes and decodes batches of task documents shaped like the ones the
+handlers store, and frames them into an OP_MSG insert the way the driver
+does. Each codec path runs in its own interpreter; the pure-Python run
+hides bson._cbson and pymongo._cmessage so the fallback is used.
+
+    python scripts/build_extensions.py   # needed for the C column
+    python benchmarks/codec.py [--docs N] [--repeat N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def task_documents(count):
+    from datetime import datetime, timedelta
+    from bson import ObjectId
+
+    created = datetime(2025, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "id": f"task-{i}",
+            "owner_id": "65f1c0ffee0000000000abcd",
+            "title": f"Task number {i}",
+            "description": "Write the quarterly report and send it to the team " * 2,
+            "status": "Pending" if i % 3 else "Completed",
+            "createdAt": created + timedelta(minutes=i),
+            "tags": ["work", "q1"],
+        }
+        for i in range(count)
+    ]
+
+
+def run(docs, repeat):
+    """Time each codec operation in this interpreter and return ops/second"""
+    import bson
+    import pymongo
+    from bson.codec_options import DEFAULT_CODEC_OPTIONS
+    from pymongo import message
+
+    tasks = task_documents(docs)
+    encoded = [bson.encode(task) for task in tasks]
+    reply = b"".join(encoded)
+    command = {"insert": "tasks", "ordered": True, "$db": "task-manager"}
+
+    cases = {
+        "encode": lambda: [bson.encode(task) for task in tasks],
+        "decode": lambda: [bson.decode(data) for data in encoded],
+        "decode_all": lambda: bson.decode_all(reply),
+        "op_msg": lambda: message._op_msg_uncompressed(
+            0, command, "documents", tasks, DEFAULT_CODEC_OPTIONS
+        ),
+    }
+    results = {"bson_c": bson.has_c(), "op_msg_c": pymongo.has_c()}
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=repeat))
+        results[name] = docs / best
+    return results
+
+
+def child(pure, docs, repeat):
+    args = [sys.executable, __file__, "--child", "--docs", str(docs), "--repeat", str(repeat)]
+    if pure:
+        args.append("--pure")
+    proc = subprocess.run(args, cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--pure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, ROOT)
+        if args.pure:
+            # A None entry makes the import fail, so the fallback is used.
+            sys.modules["bson._cbson"] = None
+            sys.modules["pymongo._cmessage"] = None
+        print(json.dumps(run(args.docs, args.repeat)))
+        return
+
+    native = child(False, args.docs, args.repeat)
+    pure = child(True, args.docs, args.repeat)
+    if not (native["bson_c"] and native["op_msg_c"]):
+        print("C extensions not built; run scripts/build_extensions.py first")
+        return
+
+    print(f"{args.docs} task documents per operation, best of {args.repeat}")
+    print(f"{'operation':<12} {'python docs/s':>14} {'c docs/s':>12} {'speedup':>8}")
+    for name in ("encode", "decode", "decode_all", "op_msg"):
+        print(f"{name:<12} {pure[name]:>14,.0f} {native[name]:>12,.0f} {native[name] / pure[name]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
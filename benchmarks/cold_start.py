@@ -0,0 +1,94 @@
+"""Cold-start import cost of lambda_function, per route.
+
+Each route runs in a fresh interpreter under ``python -X importtime``: the
+module is imported and the handler called once with a sample event. The
+import times reported on stderr are summed, so the numbers cover both the
+init phase and whatever the route imports lazily on its first call.
+
+    python benchmarks/cold_start.py [--runs N]
+
+MongoDB does not need to be reachable: unless MONGO_URI is set, the client
+points at a closed port with a 1 ms server selection timeout, which fails
+fast and leaves only the import cost.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SECRET_KEY = "benchmark-secret"
+
+CHILD = """
+import json, sys
+import lambda_function
+lambda_function.lambda_handler(json.loads(sys.argv[1]), None)
+"""
+
+
+def make_events():
+    import jwt
+
+    token = jwt.encode(
+        {"user_id": "benchmark", "exp": datetime.utcnow() + timedelta(hours=1)},
+        SECRET_KEY,
+        algorithm="HS256",
+    )
+    auth = {"Authorization": f"Bearer {token}"}
+    credentials = json.dumps({"email": "bench@example.com", "password": "secret"})
+    return {
+        "OPTIONS /": {"httpMethod": "OPTIONS", "path": "/"},
+        "GET / (no token)": {"httpMethod": "GET", "path": "/", "headers": {}},
+        "GET / (bad token)": {"httpMethod": "GET", "path": "/", "headers": {"Authorization": "Bearer x"}},
+        "POST /login": {"httpMethod": "POST", "path": "/login", "body": credentials},
+        "GET /": {"httpMethod": "GET", "path": "/", "headers": auth},
+        "POST /": {"httpMethod": "POST", "path": "/", "headers": auth, "body": json.dumps({"title": "t"})},
+        "PUT /": {"httpMethod": "PUT", "path": "/", "headers": auth, "body": json.dumps({"id": "t"})},
+        "DELETE /": {"httpMethod": "DELETE", "path": "/", "headers": auth, "body": json.dumps({"id": "t"})},
+    }
+
+
+def measure(event, env):
+    """Return (total import microseconds, imported module names) for one cold start"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, json.dumps(event)],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    total = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        modules.add(name.strip())
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    env = dict(os.environ, SECRET_KEY=SECRET_KEY, PYTHONDONTWRITEBYTECODE="1")
+    env.setdefault("MONGO_URI", "mongodb://127.0.0.1:1/?serverSelectionTimeoutMS=1")
+
+    print(f"{'route':<20} {'median ms':>10} {'modules':>8}  pymongo  jwt")
+    for route, event in make_events().items():
+        samples = []
+        for _ in range(args.runs):
+            total, modules = measure(event, env)
+            samples.append(total)
+        print(
+            f"{route:<20} {statistics.median(samples) / 1000:>10.1f} {len(modules):>8}"
+            f"  {'yes' if 'pymongo' in modules else 'no':<7}  {'yes' if 'jwt' in modules else 'no'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
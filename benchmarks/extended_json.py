@@ -0,0 +1,92 @@
+"""bson.json_util conversion speed on nested documents.
+
+Compares the converter json_util used before (recursive, every value
+through default()) with the current one (iterative, per-mode dispatch
+tables) on users with nested task lists holding datetimes, ObjectIds and
+Int64s, for each JSON mode. Also times the full json_util.dumps() call.
+
+    python benchmarks/extended_json.py [--docs N] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bson import Int64, ObjectId
+from bson import json_util
+
+
+def recursive_convert(obj, json_options):
+    """json_util._json_convert as it was before the dispatch tables"""
+    if hasattr(obj, "items"):
+        return {k: recursive_convert(v, json_options) for k, v in obj.items()}
+    elif hasattr(obj, "__iter__") and not isinstance(obj, (str, bytes)):
+        return [recursive_convert(v, json_options) for v in obj]
+    try:
+        return json_util.default(obj, json_options)
+    except TypeError:
+        return obj
+
+
+def nested_documents(count):
+    created = datetime(2025, 1, 1, 9, 30, 15, 250000)
+    return [
+        {
+            "_id": ObjectId(),
+            "email": f"user{i}@example.com",
+            "profile": {"name": f"User {i}", "joined": created, "logins": Int64(i * 1000)},
+            "tasks": [
+                {
+                    "_id": ObjectId(),
+                    "title": f"Task number {j}",
+                    "status": "Pending" if j % 3 else "Completed",
+                    "createdAt": created + timedelta(minutes=j),
+                    "tags": ["work", "q1"],
+                    "history": [{"at": created + timedelta(hours=k), "by": ObjectId()} for k in range(2)],
+                }
+                for j in range(10)
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+MODES = {
+    "relaxed": json_util.RELAXED_JSON_OPTIONS,
+    "canonical": json_util.CANONICAL_JSON_OPTIONS,
+    "legacy": json_util.LEGACY_JSON_OPTIONS,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=50, help="documents per call")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    docs = nested_documents(args.docs)
+    print(f"{args.docs} documents per call; ms/call, best of 5 x {args.repeat}")
+    print(f"{'mode':<22} {'recursive':>10} {'dispatch':>10} {'speedup':>8}")
+    for mode, options in MODES.items():
+        assert recursive_convert(docs, options) == json_util._json_convert(docs, options)
+        times = [
+            min(timeit.repeat(lambda: convert(docs, options), number=args.repeat, repeat=5)) / args.repeat
+            for convert in (recursive_convert, json_util._json_convert)
+        ]
+        print(f"{mode + ' convert':<22} {times[0] * 1e3:>10.3f} {times[1] * 1e3:>10.3f} {times[0] / times[1]:>7.1f}x")
+
+    options = json_util.RELAXED_JSON_OPTIONS
+    json_dumps = json_util.json.dumps
+    times = [
+        min(timeit.repeat(lambda: json_dumps(convert(docs, options)), number=args.repeat, repeat=5)) / args.repeat
+        for convert in (recursive_convert, json_util._json_convert)
+    ]
+    print(f"{'relaxed dumps':<22} {times[0] * 1e3:>10.3f} {times[1] * 1e3:>10.3f} {times[0] / times[1]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Throughput of each JSON backend in serializer.py on task payloads.
+
+Encodes a GET tasks page (documents as read from Mongo, with datetime and
+ObjectId values) and a /tasks/batch response, and decodes a POST task body
+and a /tasks/batch request, with every backend that is installed.
+
+    pip install orjson   # optional, for the orjson column
+    python benchmarks/json_backends.py [--tasks N] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import serializer
+
+
+def stored_tasks(count):
+    from bson import ObjectId
+
+    created = datetime(2025, 1, 1, 9, 30, 15, 250000)
+    return [
+        {
+            "_id": ObjectId(),
+            "id": f"task-{i}",
+            "owner_id": "65f1c0ffee0000000000abcd",
+            "title": f"Task number {i}",
+            "description": "Write the quarterly report and send it to the team. " * 3,
+            "status": "Pending" if i % 3 else "Completed",
+            "createdAt": created + timedelta(minutes=i),
+        }
+        for i in range(count)
+    ]
+
+
+def payloads(count):
+    tasks = stored_tasks(count)
+    batch_response = {
+        "results": [{"status": 201, "task": {k: v for k, v in t.items() if k != "owner_id"}} for t in tasks],
+        "inserted": count, "matched": 0, "modified": 0, "deleted": 0,
+    }
+    new_task = {"id": "task-1", "title": "Task number 1", "description": tasks[0]["description"], "status": "Pending"}
+    batch_request = {"operations": [
+        {"action": "update", "task": {"id": t["id"], "title": t["title"], "status": "Completed"}} for t in tasks
+    ]}
+    _, dumps = serializer.BACKENDS["json"]
+    return {
+        "encode": {"tasks page": tasks, "batch response": batch_response},
+        "decode": {"POST task": dumps(new_task), "batch request": dumps(batch_request)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=50, help="tasks per page or batch")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    cases = payloads(args.tasks)
+    backends = list(serializer.BACKENDS)
+    print(f"{args.tasks} tasks per payload; calls/s, best of 5 x {args.repeat}")
+    print(f"{'payload':<24}" + "".join(f"{name:>12}" for name in backends) + (f"{'speedup':>9}" if len(backends) > 1 else ""))
+    for operation, samples in cases.items():
+        for name, payload in samples.items():
+            rates = []
+            for backend in backends:
+                loads, dumps = serializer.BACKENDS[backend]
+                call = (lambda: dumps(payload)) if operation == "encode" else (lambda: loads(payload))
+                best = min(timeit.repeat(call, number=args.repeat, repeat=5))
+                rates.append(args.repeat / best)
+            line = f"{operation + ' ' + name:<24}" + "".join(f"{rate:>12,.0f}" for rate in rates)
+            if len(rates) > 1:
+                line += f"{rates[-1] / rates[0]:>8.1f}x"
+            print(line)
+    print(f"active backend: {serializer.BACKEND}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Mixed-traffic load test of lambda_handler through the local dev server.
+
+Starts scripts/dev_server.py in-process on a free port, backed by the
+in-process MongoDB stand-in (scripts/fake_mongo.py), registers one user
+per client, then has the clients replay a weighted mix of login, GET,
+POST, PUT and DELETE requests over keep-alive connections. Reports
+throughput, latency percentiles and errors per route.
+
+    python benchmarks/load_test.py [--clients N] [--containers N] [--duration S]
+    python benchmarks/load_test.py --url http://127.0.0.1:3000   # a running server
+
+A response counts as an error when its status is not one the route is
+expected to return (PUT and DELETE may 404 once a task is gone).
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+# route -> (weight, expected statuses)
+MIX = {
+    "POST /login": (5, {200}),
+    "GET /tasks": (50, {200}),
+    "POST /tasks": (20, {201}),
+    "PUT /tasks": (15, {200, 404}),
+    "DELETE /tasks": (10, {200, 404}),
+}
+
+
+class Client:
+    """One simulated user on its own keep-alive connection"""
+
+    def __init__(self, url, number, seed):
+        parts = urlsplit(url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+        self.base = parts.path.rstrip("/")
+        self.credentials = {"email": f"load-{number}-{seed}@example.com", "password": f"secret-{number}"}
+        self.random = random.Random(seed + number)
+        self.task_ids = []
+        self.token = None
+
+    def request(self, method, path, body=None, query=None):
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        target = self.base + path + (f"?{urlencode(query)}" if query else "")
+        self.connection.request(method, target, json.dumps(body) if body is not None else None, headers)
+        response = self.connection.getresponse()
+        return response.status, response.read()
+
+    def sign_up(self):
+        status, body = self.request("POST", "/register", self.credentials)
+        if status != 201:
+            raise RuntimeError(f"register returned {status}: {body[:200]!r}")
+        self.token = json.loads(body)["token"]
+
+    def run(self, route):
+        if route == "POST /login":
+            status, body = self.request("POST", "/login", self.credentials)
+            if status == 200:
+                self.token = json.loads(body)["token"]
+        elif route == "GET /tasks":
+            status, _ = self.request("GET", "/tasks", query={"limit": 20})
+        elif route == "POST /tasks":
+            task = {"title": f"Task {self.random.randrange(10**6)}", "status": "Pending"}
+            status, body = self.request("POST", "/tasks", task)
+            if status == 201:
+                self.task_ids.append(json.loads(body)["id"])
+        elif route == "PUT /tasks":
+            task_id = self.random.choice(self.task_ids) if self.task_ids else "missing"
+            status, _ = self.request("PUT", "/tasks", {"id": task_id, "status": "Completed"})
+        else:
+            task_id = self.task_ids.pop(self.random.randrange(len(self.task_ids))) if self.task_ids else "missing"
+            status, _ = self.request("DELETE", "/tasks", {"id": task_id})
+        return status
+
+
+def worker(client, deadline, samples):
+    routes = list(MIX)
+    weights = [weight for weight, _ in MIX.values()]
+    while time.perf_counter() < deadline:
+        route = client.random.choices(routes, weights)[0]
+        started = time.perf_counter()
+        try:
+            status = client.run(route)
+        except (OSError, http.client.HTTPException):
+            status = None
+            client.connection.close()
+        samples.append((route, time.perf_counter() - started, status))
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def report(samples, elapsed):
+    print(f"{'route':<15} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for route in [*MIX, "total"]:
+        rows = [s for s in samples if route in (s[0], "total")]
+        if not rows:
+            continue
+        latencies = sorted(latency * 1000 for _, latency, _ in rows)
+        errors = sum(1 for name, _, status in rows if status not in MIX[name][1])
+        print(
+            f"{route:<15} {len(rows):>9} {len(rows) / elapsed:>8.1f} {percentile(latencies, 0.5):>8.2f}"
+            f" {percentile(latencies, 0.9):>8.2f} {percentile(latencies, 0.99):>8.2f} {errors:>7}"
+        )
+    overall = [latency * 1000 for _, latency, _ in samples]
+    print(f"mean latency {statistics.fmean(overall):.2f} ms over {elapsed:.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--containers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of traffic")
+    parser.add_argument("--url", help="target a running server instead of starting one")
+    parser.add_argument("--seed", type=int, default=int(time.time()))
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        os.environ.setdefault("SECRET_KEY", "load-test-secret")
+        # One EMF line per request would swamp the report.
+        os.environ.setdefault("METRICS_LOG", "off")
+        import fake_mongo
+        from dev_server import ContainerPool, make_server
+
+        fake_mongo.install()
+        server = make_server(ContainerPool(args.containers), port=0, verbose=False)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    clients = [Client(url, number, args.seed) for number in range(args.clients)]
+    for client in clients:
+        client.sign_up()
+
+    samples = []
+    started = time.perf_counter()
+    deadline = started + args.duration
+    threads = [threading.Thread(target=worker, args=(client, deadline, samples)) for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    if server is not None:
+        print(f"{args.clients} clients, {args.containers} containers, in-process fake MongoDB")
+        server.shutdown()
+    else:
+        print(f"{args.clients} clients against {url}")
+    report(samples, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Login latency at each scrypt cost setting.
+
+Calls lambda_function.login with a valid password against an in-memory
+users collection, so the numbers are the handler's CPU time (password
+verification plus token signing) without the MongoDB round trip. Add the
+find_one latency of your cluster to get the end-to-end figure.
+
+    python benchmarks/login.py [--costs 12 13 14 15 16] [--runs N]
+
+Pick the highest PASSWORD_HASH_COST whose p99 still fits comfortably in the
+function timeout next to the database round trips.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+
+class UsersCollection:
+    """Just enough of a pymongo Collection for login()"""
+
+    def __init__(self, user):
+        self.user = user
+
+    def find_one(self, query):
+        return self.user if query.get("email") == self.user["email"] else None
+
+    def update_one(self, query, update):
+        self.user.update(update["$set"])
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--costs", type=int, nargs="+", default=[12, 13, 14, 15, 16])
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    db = types.ModuleType("db")
+    sys.modules["db"] = db
+    import lambda_function
+
+    body = {"email": "bench@example.com", "password": "correct horse"}
+
+    print(f"{'cost':>4} {'memory':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for cost in args.costs:
+        lambda_function.PASSWORD_HASH_COST = cost
+        db.users_collection = UsersCollection({
+            "_id": "bench",
+            "email": "bench@example.com",
+            "password": lambda_function.hash_password("correct horse"),
+        })
+        lambda_function.login(body)  # warm up imports
+        samples = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            response = lambda_function.login(body)
+            samples.append((time.perf_counter() - start) * 1000)
+            assert response["statusCode"] == 200, response
+        memory = 128 * 8 * 2 ** cost // (1024 * 1024)
+        print(f"{cost:>4} {memory:>6}MB {statistics.median(samples):>8.1f} {percentile(samples, 99):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""First-request latency with and without MONGO_PREWARM.
+
+Each run is a fresh interpreter, like a new Lambda container: it imports
+lambda_function (the init phase), then times its first GET /tasks and a
+second one on the now warm connection. With prewarm off the first request
+imports db.py and connects to MongoDB itself; with it on that happened
+during init.
+
+Needs a reachable MongoDB in MONGO_URI; use the deployment's cluster (or
+one in the same region) for numbers that include SRV lookup and TLS.
+
+    MONGO_URI=mongodb+srv://... python benchmarks/prewarm.py [--runs N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SECRET_KEY = "benchmark-secret"
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import lambda_function
+init = time.perf_counter() - start
+event = json.loads(sys.argv[1])
+timings = [init]
+for _ in range(2):
+    start = time.perf_counter()
+    response = lambda_function.lambda_handler(event, None)
+    timings.append(time.perf_counter() - start)
+    assert response["statusCode"] == 200, response
+print(json.dumps(timings))
+"""
+
+
+def tasks_event():
+    import jwt
+
+    token = jwt.encode(
+        {"user_id": "prewarm-benchmark", "exp": datetime.utcnow() + timedelta(hours=1)},
+        SECRET_KEY,
+        algorithm="HS256",
+    )
+    return {"httpMethod": "GET", "path": "/tasks", "headers": {"Authorization": f"Bearer {token}"}}
+
+
+def cold_start(event, prewarm):
+    """Return (init, first request, second request) seconds for one new container"""
+    env = dict(os.environ, SECRET_KEY=SECRET_KEY, METRICS_LOG="off", MONGO_PREWARM=prewarm)
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD, json.dumps(event)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    if not os.getenv("MONGO_URI"):
+        sys.exit("Set MONGO_URI to a reachable MongoDB")
+
+    event = tasks_event()
+    print(f"median ms over {args.runs} cold starts")
+    print(f"{'prewarm':<8} {'init':>8} {'first':>8} {'second':>8} {'init+first':>11}")
+    for prewarm in ("off", "on"):
+        runs = [cold_start(event, prewarm) for _ in range(args.runs)]
+        init, first, second = (statistics.median(run[i] for run in runs) * 1000 for i in range(3))
+        total = statistics.median((run[0] + run[1]) * 1000 for run in runs)
+        print(f"{prewarm:<8} {init:>8.1f} {first:>8.1f} {second:>8.1f} {total:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""GET tasks page encoding: decoded dicts vs raw BSON straight to JSON.
+
+Starts from the BSON of a cursor batch, as the driver receives it, and
+builds the response body both ways:
+
+    dict  decode_all into dicts (what find() does), serialize_task,
+          serializer.dumps
+    raw   the batch as find_raw_batches() returns it, raw_json.write_page
+
+Reports the time per page and, via tracemalloc, the most memory held at
+once while encoding it.
+
+    python scripts/build_extensions.py   # for the _raw_json accelerator
+    python benchmarks/raw_tasks.py [--tasks N] [--repeat N]
+"""
+import argparse
+import io
+import os
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("METRICS_LOG", "off")
+
+import bson
+from bson import ObjectId
+
+import lambda_function
+import raw_json
+import serializer
+
+
+def reply_batch(count):
+    created = datetime(2025, 1, 1, 9, 30, 15, 250000)
+    return b"".join(
+        bson.encode({
+            "_id": ObjectId(),
+            "id": f"task-{i}",
+            "title": f"Task number {i}",
+            "description": "Write the quarterly report and send it to the team. " * 3,
+            "status": "Pending" if i % 3 else "Completed",
+            "createdAt": created + timedelta(minutes=i),
+        })
+        for i in range(count)
+    )
+
+
+def dict_page(batch):
+    fields = lambda_function.READABLE_TASK_FIELDS
+    tasks = bson.decode_all(batch)
+    return "[" + ",".join(serializer.dumps(lambda_function.serialize_task(task, fields)) for task in tasks) + "]"
+
+
+def raw_page(batch):
+    out = io.StringIO()
+    out.write("[")
+    raw_json.write_page(out, [batch], lambda_function.READABLE_TASK_FIELDS, lambda_function.MAX_PAGE_SIZE)
+    out.write("]")
+    return out.getvalue()
+
+
+def peak_memory(page, batch):
+    """Most memory allocated at once while encoding one page"""
+    tracemalloc.start()
+    page(batch)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    batch = reply_batch(args.tasks)
+    assert dict_page(batch) == raw_page(batch)
+    print(f"{args.tasks} tasks per page, _raw_json accelerator: {'yes' if raw_json.has_c() else 'no'}")
+    print(f"{'path':<6} {'us/page':>9} {'peak KB':>9}")
+    for name, page in (("dict", dict_page), ("raw", raw_page)):
+        seconds = min(timeit.repeat(lambda: page(batch), number=args.repeat, repeat=5))
+        peak = peak_memory(page, batch)
+        print(f"{name:<6} {seconds / args.repeat * 1e6:>9.1f} {peak / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Resolving a mongodb+srv:// URI with and without dns_cache.py.
+
+Answers the cluster's SRV and TXT queries from a stub DNS server on
+localhost that waits --rtt ms before each reply, standing in for the VPC
+resolver, and times pymongo's parse_uri(), the step of building a client
+that looks them up:
+
+    none     no cache, every client queries DNS
+    memory   the cache install() sets up, in a warm process
+    file     a new process on the same host: the cache is loaded from
+             DNS_CACHE_FILE before the client is built
+
+    python benchmarks/srv_dns.py [--rtt MS] [--clients N]
+"""
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import dns.message
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
+import dns.rrset
+from pymongo.uri_parser import parse_uri
+
+import dns_cache
+
+CLUSTER = "cluster0.example.net"
+RECORDS = {
+    (f"_mongodb._tcp.{CLUSTER}.", dns.rdatatype.SRV): [
+        f"0 0 27017 {CLUSTER.replace('cluster0', f'cluster0-shard-00-0{i}')}." for i in range(3)
+    ],
+    (f"{CLUSTER}.", dns.rdatatype.TXT): ['"authSource=admin&replicaSet=atlas-abc123-shard-0"'],
+}
+TTL = 60
+
+
+class StubDNS:
+    """UDP DNS server for RECORDS that counts queries and delays replies"""
+
+    def __init__(self, rtt):
+        self.rtt = rtt
+        self.queries = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        while True:
+            wire, address = self.sock.recvfrom(4096)
+            query = dns.message.from_wire(wire)
+            self.queries += 1
+            response = dns.message.make_response(query)
+            question = query.question[0]
+            texts = RECORDS.get((question.name.to_text(), question.rdtype))
+            if texts:
+                response.answer.append(
+                    dns.rrset.from_text_list(question.name, TTL, dns.rdataclass.IN, question.rdtype, texts)
+                )
+            time.sleep(self.rtt)
+            self.sock.sendto(response.to_wire(), address)
+
+
+def resolve_uri(cache_file=None):
+    """Seconds to resolve the URI, after loading cache_file if given"""
+    start = time.perf_counter()
+    if cache_file:
+        dns_cache.install(cache_file)
+    parse_uri(f"mongodb+srv://{CLUSTER}/")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rtt", type=float, default=1.0, help="DNS round trip, ms")
+    parser.add_argument("--clients", type=int, default=50)
+    args = parser.parse_args()
+
+    server = StubDNS(args.rtt / 1000)
+    resolver = dns.resolver.Resolver(configure=False)
+    resolver.nameservers = ["127.0.0.1"]
+    resolver.port = server.port
+    dns.resolver.default_resolver = resolver
+    cache_file = os.path.join(tempfile.mkdtemp(), "dns-cache.json")
+
+    print(f"{args.clients} URIs, DNS round trip {args.rtt} ms")
+    print(f"{'cache':<8} {'ms/URI':>10} {'queries':>8}")
+    for mode in ("none", "memory", "file"):
+        resolver.cache = None
+        if mode != "none":
+            # Fill the file, as an earlier process would have.
+            dns_cache.install(cache_file)
+            resolve_uri()
+        queries, total = server.queries, 0.0
+        for _ in range(args.clients):
+            total += resolve_uri(cache_file if mode == "file" else None)
+        print(f"{mode:<8} {total / args.clients * 1000:>10.2f} {server.queries - queries:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Cost of building a response: per call vs pre-encoded at import.
+
+"rebuilt" is how lambda_function used to answer: a fresh CORS headers
+dict, json.dumps of a constant body and a new response dict on every
+invocation. "constant" returns the dict responses.py built at import. For
+each, reports the time per call and the memory a response keeps alive
+(blocks and bytes, via tracemalloc) until the runtime serializes it.
+
+    python benchmarks/static_responses.py [--calls N]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("METRICS_LOG", "off")
+
+import responses
+
+
+def rebuilt(payload, status):
+    def build():
+        headers = {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+            "Access-Control-Allow-Headers": "Content-Type, Authorization"
+        }
+        return {
+            "statusCode": status,
+            "body": json.dumps(payload),
+            "headers": headers
+        }
+    return build
+
+
+CASES = {
+    "preflight": (rebuilt({}, 200), lambda: responses.PREFLIGHT),
+    "token required": (
+        rebuilt({"error": "Authorization token is required"}, 401),
+        lambda: responses.TOKEN_REQUIRED,
+    ),
+    "task not found": (rebuilt({"error": "Task not found"}, 404), lambda: responses.TASK_NOT_FOUND),
+}
+
+
+def retained(build, calls):
+    """Blocks and bytes held per response while calls responses are alive"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = [build() for _ in range(calls)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    size = sum(stat.size_diff for stat in stats if stat.size_diff > 0)
+    # The list holding the responses is not part of their cost.
+    size -= sys.getsizeof(kept)
+    blocks -= 1
+    return max(blocks, 0) / calls, max(size, 0) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'response':<16} {'variant':<9} {'ns/call':>8} {'blocks':>7} {'bytes':>7}")
+    for name, variants in CASES.items():
+        for variant, build in zip(("rebuilt", "constant"), variants):
+            seconds = min(timeit.repeat(build, number=args.calls, repeat=5))
+            blocks, size = retained(build, args.calls)
+            print(f"{name:<16} {variant:<9} {seconds / args.calls * 1e9:>8.0f} {blocks:>7.1f} {size:>7.0f}")
+
+    import lambda_function
+    event = {"httpMethod": "OPTIONS", "path": "/tasks"}
+    calls = args.calls // 10
+    seconds = min(timeit.repeat(lambda: lambda_function.lambda_handler(event, None), number=calls, repeat=5))
+    print(f"\nlambda_handler OPTIONS: {seconds / calls * 1e6:.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
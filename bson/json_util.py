@@ -508,17 +508,46 @@ def loads(s: Union[str, bytes, bytearray], *args: Any, **kwargs: Any) -> Any:
 
 
 def _json_convert(obj: Any, json_options: JSONOptions = DEFAULT_JSON_OPTIONS) -> Any:
-    """Recursive helper method that converts BSON types so they can be
-    converted into json.
+    """Helper method that converts BSON types so they can be converted into
+    json.
+
+    Walks nested documents and lists with an explicit stack instead of
+    recursion. Each container is first copied whole, then only the values
+    that need converting are replaced, looked up by exact type in the
+    dispatch table for `json_options` (see :func:`_dispatch_for`).
     """
-    if hasattr(obj, "items"):
-        return {k: _json_convert(v, json_options) for k, v in obj.items()}
-    elif hasattr(obj, "__iter__") and not isinstance(obj, (str, bytes)):
-        return [_json_convert(v, json_options) for v in obj]
-    try:
-        return default(obj, json_options)
-    except TypeError:
-        return obj
+    passthrough, encoders = _dispatch_for(json_options)
+    root = [obj]
+    stack = [(enumerate(root), root)]
+    while stack:
+        items, out = stack[-1]
+        for key, value in items:
+            cls = type(value)
+            if cls in passthrough:
+                continue
+            encoder = encoders.get(cls)
+            if encoder is None:
+                if cls is dict or hasattr(value, "items"):
+                    child: Any = dict(value) if cls is dict else dict(value.items())
+                    out[key] = child
+                    stack.append((iter(child.items()), child))
+                    break
+                if cls is list or (hasattr(value, "__iter__") and not isinstance(value, (str, bytes))):
+                    child = list(value)
+                    out[key] = child
+                    stack.append((enumerate(child), child))
+                    break
+                encoder = _lookup_encoder(value)
+                if encoder is None:
+                    continue
+                encoders[cls] = encoder
+            try:
+                out[key] = encoder(value, json_options)
+            except TypeError:
+                pass
+        else:
+            stack.pop()
+    return root[0]
 
 
 def object_pairs_hook(
@@ -1017,13 +1046,33 @@ for _typ in _ENCODERS:
 _BUILT_IN_TYPES = tuple(t for t in _ENCODERS)
 
 
-def default(obj: Any, json_options: JSONOptions = DEFAULT_JSON_OPTIONS) -> Any:
-    # First see if the type is already cached. KeyError will only ever
+def _encode_datetime_iso8601(obj: datetime.datetime, json_options: JSONOptions) -> dict:
+    # Same output as _encode_datetime for naive and UTC datetimes since the
+    # epoch, the ones decoded from BSON, without strftime or replace().
+    if (obj.tzinfo is None or obj.tzinfo is utc) and obj.year >= 1970:
+        millis = obj.microsecond // 1000
+        return {
+            "$date": "%04d-%02d-%02dT%02d:%02d:%02d%sZ"
+            % (
+                obj.year,
+                obj.month,
+                obj.day,
+                obj.hour,
+                obj.minute,
+                obj.second,
+                ".%03d" % millis if millis else "",
+            )
+        }
+    return _encode_datetime(obj, json_options)
+
+
+def _lookup_encoder(obj: Any) -> Optional[Callable[[Any, JSONOptions], Any]]:
+    """Find the encoder for obj, or None if it is not a BSON type."""
+    # First see if the type is already cached. A miss will only ever
     # happen once per subtype.
-    try:
-        return _ENCODERS[type(obj)](obj, json_options)
-    except KeyError:
-        pass
+    func = _ENCODERS.get(type(obj))
+    if func is not None:
+        return func
 
     # Second, fall back to trying _type_marker. This has to be done
     # before the loop below since users could subclass one of our
@@ -1034,7 +1083,7 @@ def default(obj: Any, json_options: JSONOptions = DEFAULT_JSON_OPTIONS) -> Any:
             func = _MARKERS[marker]
             # Cache this type for faster subsequent lookup.
             _ENCODERS[type(obj)] = func
-            return func(obj, json_options)
+            return func
 
     # Third, test each base type. This will only happen once for
     # a subtype of a supported base type.
@@ -1043,9 +1092,56 @@ def default(obj: Any, json_options: JSONOptions = DEFAULT_JSON_OPTIONS) -> Any:
             func = _ENCODERS[base]
             # Cache this type for faster subsequent lookup.
             _ENCODERS[type(obj)] = func
-            return func(obj, json_options)
+            return func
 
-    raise TypeError("%r is not JSON serializable" % obj)
+    return None
+
+
+def default(obj: Any, json_options: JSONOptions = DEFAULT_JSON_OPTIONS) -> Any:
+    func = _lookup_encoder(obj)
+    if func is None:
+        raise TypeError("%r is not JSON serializable" % obj)
+    return func(obj, json_options)
+
+
+# Dispatch tables used by _json_convert, one per (json_mode,
+# datetime_representation), the only options that change which encoder a
+# type needs. Each is (passthrough, encoders): the exact types whose values
+# are emitted unchanged, and a copy of _ENCODERS without them and with
+# specialized encoders where the options allow one.
+_DISPATCH_TABLES: dict[
+    Tuple[int, int], Tuple[frozenset[Type], dict[Type, Callable[[Any, JSONOptions], Any]]]
+] = {}
+
+
+def _build_dispatch(
+    json_mode: int, datetime_representation: int
+) -> Tuple[frozenset[Type], dict[Type, Callable[[Any, JSONOptions], Any]]]:
+    passthrough = {str, bool, type(None)}
+    if json_mode != JSONMode.CANONICAL:
+        passthrough.add(int)
+    encoders = {typ: func for typ, func in _ENCODERS.items() if typ not in passthrough}
+    if datetime_representation == DatetimeRepresentation.ISO8601:
+        encoders[datetime.datetime] = _encode_datetime_iso8601
+    return frozenset(passthrough), encoders
+
+
+def _dispatch_for(
+    json_options: JSONOptions,
+) -> Tuple[frozenset[Type], dict[Type, Callable[[Any, JSONOptions], Any]]]:
+    if json_options is RELAXED_JSON_OPTIONS:
+        return _RELAXED_DISPATCH
+    key = (json_options.json_mode, json_options.datetime_representation)
+    table = _DISPATCH_TABLES.get(key)
+    if table is None:
+        table = _DISPATCH_TABLES[key] = _build_dispatch(*key)
+    return table
+
+
+# The default options get their table without any lookup.
+_RELAXED_DISPATCH = _DISPATCH_TABLES[
+    (JSONMode.RELAXED, DatetimeRepresentation.ISO8601)
+] = _build_dispatch(JSONMode.RELAXED, DatetimeRepresentation.ISO8601)
 
 
 def _get_str_size(obj: Any) -> int:
@@ -1,15 +1,157 @@
-from pymongo import MongoClient
-import os 
+import bson
+import pymongo
+from pymongo import MongoClient, IndexModel, ASCENDING
+from pymongo.errors import PyMongoError
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from bson import ObjectId
 
-MONGO_URI = os.getenv('MONGO_URI')
+import metrics
+from mongo_settings import MONGO_URI, CommandTimer, cache_srv_lookups, client_options
 
-client = MongoClient(MONGO_URI)
+# Whether BSON encoding/decoding and OP_MSG framing run in the C extensions
+# or the pure-Python fallback; see scripts/build_extensions.py.
+CODECS = {
+    "bson": "c" if bson.has_c() else "python",
+    "op_msg": "c" if pymongo.has_c() else "python",
+}
+metrics.log("info", "Mongo codecs", **CODECS)
+
+cache_srv_lookups(MONGO_URI)
+client = MongoClient(MONGO_URI, event_listeners=[CommandTimer()], **client_options(MONGO_URI))
 db = client.get_database("task-manager")
 tasks_collection = db.get_collection("tasks")
 users_collection = db.get_collection("users")
 
+# Indexes the handlers rely on, per collection.
+INDEXES = [
+    (tasks_collection, [
+        # Every task read is scoped to its owner and ordered by creation time,
+        # so each user's queries walk only their own slice of this index. _id
+        # is the tie-breaker for tasks created in the same millisecond.
+        IndexModel(
+            [("owner_id", ASCENDING), ("createdAt", ASCENDING), ("_id", ASCENDING)],
+            name="owner_id_createdAt"
+        ),
+        # The same, for GET tasks filtered by status.
+        IndexModel(
+            [("owner_id", ASCENDING), ("status", ASCENDING), ("createdAt", ASCENDING), ("_id", ASCENDING)],
+            name="owner_id_status_createdAt"
+        ),
+        # GET tasks sorted by title or filtered by a title prefix.
+        IndexModel(
+            [("owner_id", ASCENDING), ("title", ASCENDING), ("_id", ASCENDING)],
+            name="owner_id_title"
+        ),
+        # PUT and DELETE look tasks up by id. Tasks stored before ids were
+        # assigned on insert have none, so they are left out of the index.
+        IndexModel(
+            [("id", ASCENDING)],
+            name="id_unique",
+            unique=True,
+            partialFilterExpression={"id": {"$exists": True}}
+        ),
+    ]),
+    (users_collection, [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ]),
+]
+
+# One sample of every query the handlers send, checked by check_query_plans.
+QUERY_SHAPES = [
+    ("get_tasks", tasks_collection, {"owner_id": ""}, [("createdAt", 1), ("_id", 1)]),
+    ("get_tasks next page", tasks_collection, {
+        "owner_id": "",
+        "$or": [
+            {"createdAt": {"$gt": datetime(1970, 1, 1)}},
+            {"createdAt": datetime(1970, 1, 1), "_id": {"$gt": ObjectId("0" * 24)}}
+        ]
+    }, [("createdAt", 1), ("_id", 1)]),
+    ("get_tasks status+createdAt range", tasks_collection, {
+        "owner_id": "",
+        "status": "",
+        "createdAt": {"$gte": datetime(1970, 1, 1), "$lt": datetime(1970, 1, 2)}
+    }, [("createdAt", -1), ("_id", -1)]),
+    ("get_tasks titlePrefix", tasks_collection, {
+        "owner_id": "",
+        "title": {"$regex": "^a"}
+    }, [("title", 1), ("_id", 1)]),
+    ("get_tasks sort=title", tasks_collection, {
+        "owner_id": "",
+        "title": {"$gte": ""}
+    }, [("title", -1), ("_id", -1)]),
+    ("update_task/delete_task", tasks_collection, {"id": "", "owner_id": ""}, None),
+    ("batch_tasks existing ids", tasks_collection, {"id": {"$in": ["", " "]}, "owner_id": ""}, None),
+    ("register/login", users_collection, {"email": ""}, None),
+]
+
+_indexes_ready = False
+
+def ensure_indexes():
+    """Create the declared indexes, once per container.
+
+    createIndexes is a no-op for indexes that already exist with the same
+    spec, so running this on every cold start is safe.
+    """
+    global _indexes_ready
+    if _indexes_ready:
+        return
+    for collection, indexes in INDEXES:
+        collection.create_indexes(indexes)
+    _indexes_ready = True
+
+def check_query_plans():
+    """Explain every handler query shape and return the ones that scan the collection"""
+    collscans = []
+    for name, collection, query, sort in QUERY_SHAPES:
+        cursor = collection.find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain()["queryPlanner"]["winningPlan"]
+        if "COLLSCAN" in _plan_stages(plan):
+            collscans.append(name)
+    return collscans
+
+def _plan_stages(plan):
+    if isinstance(plan, dict):
+        stages = [plan["stage"]] if "stage" in plan else []
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+        return stages
+    if isinstance(plan, list):
+        return [stage for item in plan for stage in _plan_stages(item)]
+    return []
+
+def prewarm():
+    """Open the pool's minPoolSize connections now, rather than on a request.
+
+    Each ping checks out its own connection, paying for server selection
+    (SRV lookup, TLS, handshake, auth) up front. Returns whether the server
+    was reached.
+    """
+    connections = max(client.options.pool_options.min_pool_size, 1)
+    start = time.perf_counter()
+    try:
+        if connections == 1:
+            client.admin.command("ping")
+        else:
+            with ThreadPoolExecutor(connections) as executor:
+                list(executor.map(lambda _: client.admin.command("ping"), range(connections)))
+    except PyMongoError as e:
+        metrics.log_error("Error connecting to MongoDB", e)
+        return False
+    metrics.log("info", "Mongo prewarm", connections=connections, ms=round((time.perf_counter() - start) * 1000, 1))
+    return True
+
+# An unreachable server has already cost serverSelectionTimeoutMS once.
+if prewarm():
+    try:
+        ensure_indexes()
+    except PyMongoError as e:
+        metrics.log_error("Error creating indexes", e)
+
 def add_task(task):
     task["createdAt"] = datetime.utcnow()
     result = tasks_collection.insert_one(task)
@@ -40,4 +182,12 @@ def delete_task(task):
     if result.deleted_count > 0:
         return {"statusCode": 200, "body": json.dumps({"message": "Task deleted successfully"})}
     else:
-        return {"statusCode": 404, "body": json.dumps({"error": "Task not found"})}
\ No newline at end of file
+        return {"statusCode": 404, "body": json.dumps({"error": "Task not found"})}
+
+if __name__ == "__main__":
+    # Self-test: python db.py
+    ensure_indexes()
+    collscans = check_query_plans()
+    for name in collscans:
+        print(f"COLLSCAN: {name}")
+    sys.exit(1 if collscans else 0)
@@ -0,0 +1,114 @@
+"""DNS answer cache for mongodb+srv:// URIs, kept in memory and in a file.
+
+Building a client from a mongodb+srv:// URI looks up the cluster's SRV and
+TXT records through dnspython's default resolver, and the driver repeats
+the SRV lookup when it rescans for hosts. install() gives that resolver a
+cache, so a client built again in the same process skips DNS until the
+records' TTLs run out. Each answer is also written to DNS_CACHE_FILE
+(under /tmp by default), and a new process on the same host (a restarted
+runtime in the same Lambda execution environment, the next run of a local
+script) starts with the answers still in their TTL. The file is only
+loaded if it belongs to this process's user and no one else can read or
+write it (mode 0600, as it is written), since /tmp is shared with other
+users on a multi-user host and a planted file would redirect the driver.
+
+Set DNS_CACHE_FILE to an empty string to keep the cache in memory only.
+"""
+import base64
+import contextlib
+import json
+import os
+import tempfile
+import time
+
+import dns.message
+import dns.name
+import dns.resolver
+
+import metrics
+
+CACHE_FILE = os.getenv("DNS_CACHE_FILE", os.path.join(tempfile.gettempdir(), "task-manager-dns-cache.json"))
+
+# A cluster needs an SRV and a TXT answer; this leaves room for several.
+MAX_ENTRIES = 64
+
+class PersistentCache(dns.resolver.LRUCache):
+    """LRUCache that saves its answers to a file and loads them back"""
+
+    def __init__(self, path: str, max_size: int = MAX_ENTRIES):
+        super().__init__(max_size)
+        self.path = path
+        if path:
+            self._load()
+
+    def put(self, key, value):
+        super().put(key, value)
+        if self.path:
+            self._save()
+
+    def _load(self):
+        try:
+            fd = os.open(self.path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+        except OSError:
+            return
+        with os.fdopen(fd) as f:
+            if not owned_privately(os.fstat(fd)):
+                metrics.log("warning", "Ignoring DNS cache file not private to this user", path=self.path)
+                return
+            try:
+                entries = json.load(f)
+            except ValueError:
+                return
+        now = time.time()
+        for entry in entries:
+            if entry["expiration"] <= now:
+                continue
+            try:
+                name = dns.name.from_text(entry["name"])
+                response = dns.message.from_wire(base64.b64decode(entry["response"]))
+                answer = dns.resolver.Answer(name, entry["rdtype"], entry["rdclass"], response)
+            except Exception:
+                # A damaged entry is only a cache miss.
+                continue
+            answer.expiration = entry["expiration"]
+            super().put((name, entry["rdtype"], entry["rdclass"]), answer)
+
+    def _save(self):
+        now = time.time()
+        with self.lock:
+            entries = [
+                {
+                    "name": name.to_text(),
+                    "rdtype": int(rdtype),
+                    "rdclass": int(rdclass),
+                    "expiration": node.value.expiration,
+                    "response": base64.b64encode(node.value.response.to_wire()).decode("ascii"),
+                }
+                for (name, rdtype, rdclass), node in self.data.items()
+                if node.value.expiration > now
+            ]
+        # Written beside the old file and renamed over it, so a reader in
+        # another process never sees half of one. mkstemp creates it 0600.
+        temp_path = None
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            metrics.log_error("Error saving DNS cache", e)
+            if temp_path is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(temp_path)
+
+def owned_privately(stat) -> bool:
+    """Whether a file belongs to this process's user and only they can use it"""
+    if not hasattr(os, "getuid"):
+        return True
+    return stat.st_uid == os.getuid() and stat.st_mode & 0o077 == 0
+
+def install(path: str = CACHE_FILE) -> PersistentCache:
+    """Give dnspython's default resolver, which pymongo uses, a PersistentCache"""
+    cache = PersistentCache(path)
+    dns.resolver.get_default_resolver().cache = cache
+    return cache
@@ -1,12 +1,20 @@
 from .api_jwk import PyJWK, PyJWKSet
 from .api_jws import (
     PyJWS,
+    PyJWSVerifier,
     get_algorithm_by_name,
     get_unverified_header,
     register_algorithm,
     unregister_algorithm,
 )
-from .api_jwt import PyJWT, decode, decode_complete, encode
+from .api_jwt import (
+    PyJWT,
+    PyJWTVerifier,
+    decode,
+    decode_complete,
+    encode,
+    verifier,
+)
 from .exceptions import (
     DecodeError,
     ExpiredSignatureError,
@@ -44,7 +52,9 @@ __copyright__ = "Copyright 2015-2022 José Padilla"
 
 __all__ = [
     "PyJWS",
+    "PyJWSVerifier",
     "PyJWT",
+    "PyJWTVerifier",
     "PyJWKClient",
     "PyJWK",
     "PyJWKSet",
@@ -55,6 +65,7 @@ __all__ = [
     "register_algorithm",
     "unregister_algorithm",
     "get_algorithm_by_name",
+    "verifier",
     # Exceptions
     "DecodeError",
     "ExpiredSignatureError",
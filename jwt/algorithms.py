@@ -4,7 +4,16 @@ import hashlib
 import hmac
 import json
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Any, ClassVar, Literal, NoReturn, cast, overload
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ClassVar,
+    Literal,
+    NoReturn,
+    cast,
+    overload,
+)
 
 from .exceptions import InvalidKeyError
 from .types import HashlibHash, JWKDict
@@ -184,6 +193,19 @@ class Algorithm(ABC):
         for the specified message and key values.
         """
 
+    def prepare_verifier(self, key: Any) -> Callable[[bytes, bytes], bool]:
+        """
+        Prepares the key once and returns a callable that verifies a
+        (message, signature) pair against it, for callers that check many
+        tokens with the same key.
+        """
+        prepared_key = self.prepare_key(key)
+
+        def verifier(msg: bytes, sig: bytes) -> bool:
+            return self.verify(msg, prepared_key, sig)
+
+        return verifier
+
     @overload
     @staticmethod
     @abstractmethod
@@ -310,6 +332,19 @@ class HMACAlgorithm(Algorithm):
     def verify(self, msg: bytes, key: bytes, sig: bytes) -> bool:
         return hmac.compare_digest(sig, self.sign(msg, key))
 
+    def prepare_verifier(self, key: str | bytes) -> Callable[[bytes, bytes], bool]:
+        # Keying the HMAC (padding the key, hashing the inner and outer pads)
+        # only depends on the key, so do it once and copy that state for
+        # every message.
+        base = hmac.new(self.prepare_key(key), digestmod=self.hash_alg)
+
+        def verifier(msg: bytes, sig: bytes) -> bool:
+            mac = base.copy()
+            mac.update(msg)
+            return hmac.compare_digest(sig, mac.digest())
+
+        return verifier
+
 
 if has_crypto:
 
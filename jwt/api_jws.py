@@ -247,6 +247,25 @@ class PyJWS:
         )
         return decoded["payload"]
 
+    def verifier(
+        self,
+        key: AllowedPublicKeys | PyJWK | str | bytes,
+        algorithms: Sequence[str] | None = None,
+    ) -> PyJWSVerifier:
+        """
+        Returns a verifier bound to one key and set of allowed algorithms.
+
+        Algorithm lookup and key preparation happen once, here, instead of
+        on every decode; use it when many tokens are checked against the
+        same static key.
+
+        Example usage:
+
+        >>> verifier = jws_obj.verifier(secret, algorithms=["HS256"])
+        >>> payload = verifier.decode(token)
+        """
+        return PyJWSVerifier(self, key, algorithms)
+
     def get_unverified_header(self, jwt: str | bytes) -> dict[str, Any]:
         """Returns back the JWT header parameters as a dict()
 
@@ -271,6 +290,21 @@ class PyJWS:
         except ValueError as err:
             raise DecodeError("Not enough segments") from err
 
+        header = self._load_header(header_segment)
+
+        try:
+            payload = base64url_decode(payload_segment)
+        except (TypeError, binascii.Error) as err:
+            raise DecodeError("Invalid payload padding") from err
+
+        try:
+            signature = base64url_decode(crypto_segment)
+        except (TypeError, binascii.Error) as err:
+            raise DecodeError("Invalid crypto padding") from err
+
+        return (payload, signing_input, header, signature)
+
+    def _load_header(self, header_segment: bytes) -> dict[str, Any]:
         try:
             header_data = base64url_decode(header_segment)
         except (TypeError, binascii.Error) as err:
@@ -284,17 +318,7 @@ class PyJWS:
         if not isinstance(header, dict):
             raise DecodeError("Invalid header string: must be a json object")
 
-        try:
-            payload = base64url_decode(payload_segment)
-        except (TypeError, binascii.Error) as err:
-            raise DecodeError("Invalid payload padding") from err
-
-        try:
-            signature = base64url_decode(crypto_segment)
-        except (TypeError, binascii.Error) as err:
-            raise DecodeError("Invalid crypto padding") from err
-
-        return (payload, signing_input, header, signature)
+        return header
 
     def _verify_signature(
         self,
@@ -336,6 +360,115 @@ class PyJWS:
             raise InvalidTokenError("Key ID header parameter must be a string")
 
 
+class PyJWSVerifier:
+    """
+    Signature verifier bound to a fixed key and set of allowed algorithms,
+    created by :meth:`PyJWS.verifier`. Signatures are always verified.
+    """
+
+    # Tokens from one issuer share a handful of distinct header segments.
+    _header_cache_size = 16
+
+    def __init__(
+        self,
+        jws: PyJWS,
+        key: AllowedPublicKeys | PyJWK | str | bytes,
+        algorithms: Sequence[str] | None = None,
+    ) -> None:
+        if isinstance(key, PyJWK):
+            if algorithms is None:
+                algorithms = [key.algorithm_name]
+            self._verifiers = {
+                alg: key.Algorithm.prepare_verifier(key.key) for alg in algorithms
+            }
+        else:
+            if not algorithms:
+                raise DecodeError(
+                    'It is required that you pass in a value for the "algorithms" argument when creating a verifier.'
+                )
+            self._verifiers = {
+                alg: jws.get_algorithm_by_name(alg).prepare_verifier(key)
+                for alg in algorithms
+            }
+        self._jws = jws
+        self._headers: dict[bytes, dict[str, Any]] = {}
+
+    def decode_complete(
+        self,
+        jwt: str | bytes,
+        detached_payload: bytes | None = None,
+    ) -> dict[str, Any]:
+        payload, signing_input, header, signature = self._load(jwt)
+
+        if header.get("b64", True) is False:
+            if detached_payload is None:
+                raise DecodeError(
+                    'It is required that you pass in a value for the "detached_payload" argument to decode a message having the b64 header set to false.'
+                )
+            payload = detached_payload
+            signing_input = b".".join([signing_input.rsplit(b".", 1)[0], payload])
+
+        try:
+            alg = header["alg"]
+        except KeyError:
+            raise InvalidAlgorithmError("Algorithm not specified") from None
+
+        verifier = self._verifiers.get(alg) if isinstance(alg, str) else None
+        if verifier is None:
+            raise InvalidAlgorithmError("The specified alg value is not allowed")
+
+        if not verifier(signing_input, signature):
+            raise InvalidSignatureError("Signature verification failed")
+
+        return {
+            "payload": payload,
+            "header": header,
+            "signature": signature,
+        }
+
+    def decode(
+        self,
+        jwt: str | bytes,
+        detached_payload: bytes | None = None,
+    ) -> Any:
+        decoded = self.decode_complete(jwt, detached_payload=detached_payload)
+        return decoded["payload"]
+
+    def _load(self, jwt: str | bytes) -> tuple[bytes, bytes, dict[str, Any], bytes]:
+        # Same as PyJWS._load, but header segments already seen are not
+        # base64-decoded and parsed again.
+        if isinstance(jwt, str):
+            jwt = jwt.encode("utf-8")
+
+        if not isinstance(jwt, bytes):
+            raise DecodeError(f"Invalid token type. Token must be a {bytes}")
+
+        try:
+            signing_input, crypto_segment = jwt.rsplit(b".", 1)
+            header_segment, payload_segment = signing_input.split(b".", 1)
+        except ValueError as err:
+            raise DecodeError("Not enough segments") from err
+
+        header = self._headers.get(header_segment)
+        if header is None:
+            header = self._jws._load_header(header_segment)
+            if len(self._headers) >= self._header_cache_size:
+                self._headers.clear()
+            self._headers[header_segment] = header
+
+        try:
+            payload = base64url_decode(payload_segment)
+        except (TypeError, binascii.Error) as err:
+            raise DecodeError("Invalid payload padding") from err
+
+        try:
+            signature = base64url_decode(crypto_segment)
+        except (TypeError, binascii.Error) as err:
+            raise DecodeError("Invalid crypto padding") from err
+
+        return (payload, signing_input, dict(header), signature)
+
+
 _jws_global_obj = PyJWS()
 encode = _jws_global_obj.encode
 decode_complete = _jws_global_obj.decode_complete
@@ -344,3 +477,4 @@ register_algorithm = _jws_global_obj.register_algorithm
 unregister_algorithm = _jws_global_obj.unregister_algorithm
 get_algorithm_by_name = _jws_global_obj.get_algorithm_by_name
 get_unverified_header = _jws_global_obj.get_unverified_header
+verifier = _jws_global_obj.verifier
@@ -233,6 +233,40 @@ class PyJWT:
         )
         return decoded["payload"]
 
+    def verifier(
+        self,
+        key: AllowedPublicKeys | PyJWK | str | bytes,
+        algorithms: Sequence[str] | None = None,
+        options: dict[str, Any] | None = None,
+        audience: str | Iterable[str] | None = None,
+        issuer: str | Sequence[str] | None = None,
+        subject: str | None = None,
+        leeway: float | timedelta = 0,
+    ) -> PyJWTVerifier:
+        """
+        Returns a verifier bound to one key, set of allowed algorithms and
+        claim validation settings.
+
+        The key is prepared and the options merged once, so decoding a token
+        only does the work that depends on the token. The signature is always
+        verified; ``options`` only tunes claim validation.
+
+        Example usage:
+
+        >>> verifier = jwt_obj.verifier(secret, algorithms=["HS256"])
+        >>> payload = verifier.decode(token)
+        """
+        return PyJWTVerifier(
+            self,
+            key,
+            algorithms,
+            options=options,
+            audience=audience,
+            issuer=issuer,
+            subject=subject,
+            leeway=leeway,
+        )
+
     def _validate_claims(
         self,
         payload: dict[str, Any],
@@ -427,7 +461,70 @@ class PyJWT:
                 raise InvalidIssuerError("Invalid issuer")
 
 
+class PyJWTVerifier:
+    """
+    Token verifier bound to a fixed key, set of allowed algorithms and claim
+    validation settings, created by :meth:`PyJWT.verifier`.
+    """
+
+    def __init__(
+        self,
+        jwt_obj: PyJWT,
+        key: AllowedPublicKeys | PyJWK | str | bytes,
+        algorithms: Sequence[str] | None = None,
+        options: dict[str, Any] | None = None,
+        audience: str | Iterable[str] | None = None,
+        issuer: str | Sequence[str] | None = None,
+        subject: str | None = None,
+        leeway: float | timedelta = 0,
+    ) -> None:
+        options = {**jwt_obj.options, **(options or {})}
+        if not options["verify_signature"]:
+            raise ValueError("A verifier always verifies the signature.")
+
+        if audience is not None and not isinstance(audience, (str, Iterable)):
+            raise TypeError("audience must be a string, iterable or None")
+
+        self._jwt = jwt_obj
+        self._jws = api_jws.verifier(key, algorithms)
+        self._options = options
+        self._audience = audience
+        self._issuer = issuer
+        self._subject = subject
+        self._leeway = leeway
+
+    def decode_complete(
+        self,
+        jwt: str | bytes,
+        detached_payload: bytes | None = None,
+    ) -> dict[str, Any]:
+        decoded = self._jws.decode_complete(jwt, detached_payload=detached_payload)
+
+        payload = self._jwt._decode_payload(decoded)
+
+        self._jwt._validate_claims(
+            payload,
+            self._options,
+            audience=self._audience,
+            issuer=self._issuer,
+            leeway=self._leeway,
+            subject=self._subject,
+        )
+
+        decoded["payload"] = payload
+        return decoded
+
+    def decode(
+        self,
+        jwt: str | bytes,
+        detached_payload: bytes | None = None,
+    ) -> Any:
+        decoded = self.decode_complete(jwt, detached_payload=detached_payload)
+        return decoded["payload"]
+
+
 _jwt_global_obj = PyJWT()
 encode = _jwt_global_obj.encode
 decode_complete = _jwt_global_obj.decode_complete
 decode = _jwt_global_obj.decode
+verifier = _jwt_global_obj.verifier
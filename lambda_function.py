@@ -1,98 +1,177 @@
-import json
-import jwt
-from db import tasks_collection
-from db import users_collection
-from pymongo import MongoClient
-from bson import ObjectId
+# Only the standard library (and orjson, through serializer.py, when it is
+# installed) is imported here. jwt, pymongo/bson (through db.py) and
+# hashlib are imported inside the handlers that use them, so a cold start
+# pays only for what its route needs: OPTIONS and a missing token never
+# load the Mongo driver. See benchmarks/cold_start.py. The exception is
+# MONGO_PREWARM, below.
 from datetime import datetime, timedelta
-from dotenv import load_dotenv
 import os
-import hashlib
+import base64
+import binascii
+import time
+import io
+from collections import OrderedDict
 
-load_dotenv()
+import metrics
+import responses
+import serializer
+import task_cache
+from router import ANY_RESOURCE, bind_routes, compile_routes, dispatch, resource_for
+
+# .env files are for local runs; deployed functions get real env vars.
+if os.path.exists(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 
+# log2 of the scrypt work factor N. Each step doubles login CPU time and
+# memory (128 * 8 * 2**cost bytes); see benchmarks/login.py to pick one.
+PASSWORD_HASH_COST = int(os.getenv("PASSWORD_HASH_COST", "14"))
+
+# With MONGO_PREWARM=on db.py is imported in the init phase, so the client
+# is built and its connection opened (see db.prewarm) before the first
+# request rather than by it. That takes the connection setup off the first
+# request when Lambda initializes a container ahead of traffic (provisioned
+# concurrency, proactive init). It is off by default: an on-demand cold
+# start would wait on MongoDB (up to the server selection timeout) even for
+# OPTIONS or a request without a token, and local scripts, and
+# async_handler.py, which imports this module, should not wait on it.
+MONGO_PREWARM = os.getenv("MONGO_PREWARM", "off") == "on"
+if MONGO_PREWARM:
+    import db
+
+# True until this container has served its first invocation.
+_cold_start = True
+
+# Warm containers see the same bearer token on request after request, so
+# verified claims are kept (keyed by a digest of the token) until the
+# token's exp and repeat requests skip signature checking and parsing.
+TOKEN_CACHE_SIZE = 1024
+_verified_tokens = OrderedDict()
+_token_verifier = None
+
+# GET /tasks pages, invalidated by the user's writes (see task_cache.py);
+# None while TASK_CACHE_TTL is 0.
+_task_cache = task_cache.from_env()
+
+# Index hints a GET tasks query failed with and then succeeded without:
+# db.ensure_indexes() could not create the index (a duplicate id, missing
+# permissions), and it is logged there. Queries in this container run
+# unhinted rather than failing.
+_missing_hints = set()
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Tasks fetched per round trip while streaming a page; bounds how many
+# decoded documents are held at once.
+TASK_BATCH_SIZE = 100
+
+# Most operations accepted by one /tasks/batch request.
+MAX_BATCH_SIZE = 100
+
+INVALID_LIMIT = responses.constant_error(400, f"limit must be between 1 and {MAX_PAGE_SIZE}")
+INVALID_BATCH = responses.constant_error(400, f"operations must be a list of 1 to {MAX_BATCH_SIZE} items")
+
+# Task fields a client may store, with their maximum length. Anything else
+# in a POST or PUT body is dropped, so documents stay small.
+TASK_FIELDS = {
+    "id": 64,
+    "title": 200,
+    "description": 2000,
+    "status": 32
+}
+# Task fields a client may read: the stored ones plus those set on insert.
+READABLE_TASK_FIELDS = (*TASK_FIELDS, "createdAt")
+
 def lambda_handler(event, context):
+    global _cold_start
     http_method = event.get("httpMethod")
-    headers = {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-        "Access-Control-Allow-Headers": "Content-Type, Authorization"
-    }
-      
     path = event.get("resource") or event.get("path") or ""
+    resource = resource_for(path, RESOURCES, "/tasks")
+    invocation = metrics.start_invocation(
+        route=f"{http_method} {resource}",
+        request_id=getattr(context, "aws_request_id", None)
+            or (event.get("requestContext") or {}).get("requestId")
+    )
 
-    if "/login" in path and http_method == "POST":
-        return login(event, headers) 
-    
-    if "/register" in path and http_method == "POST":
-        return register(event, headers)
+    response = None
+    try:
+        response = dispatch(ROUTE_TABLE, http_method, resource, event) or responses.UNSUPPORTED_METHOD
+        return response
+    finally:
+        # An exception escaping the handler reaches the client as a 502.
+        metrics.emit(
+            invocation,
+            status=response["statusCode"] if response else 502,
+            bytes_in=metrics.utf8_length(event.get("body")),
+            bytes_out=metrics.utf8_length(response.get("body")) if response else 0,
+            cold=_cold_start
+        )
+        _cold_start = False
+
+def authenticate(request):
+    """Middleware: resolve the bearer token to request["user_id"], or answer 401"""
+    request_headers = request["event"].get("headers") or {}
+    authorization = request_headers.get("Authorization") or request_headers.get("authorization") or ""
+    token = authorization.replace("Bearer ", "")
+    if not token:
+        return responses.TOKEN_REQUIRED
 
-    token = event.get("headers", {}).get("Authorization", "").replace("Bearer ", "")
-    if token:
+    decoded_token = cached_token(token)
+    if decoded_token is None:
+        import jwt
+        verifier = token_verifier()
         try: 
-            decoded_token = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-            user_id = decoded_token["user_id"]
+            with metrics.timed("JwtTime"):
+                decoded_token = verifier.decode(token)
         except jwt.ExpiredSignatureError:
-            return {
-                "statusCode": 401,
-                "body": json.dumps({"error": "Token has expired"}),
-                "headers": headers
-            }
+            return responses.TOKEN_EXPIRED
         except jwt.InvalidTokenError:
-            return {
-                "statusCode": 401,
-                "body": json.dumps({"error": "Invalid token"}),
-                "headers": headers
-            }
-    else:
-        return {
-            "statusCode": 401,
-            "body": json.dumps({"error": "Authorization token is required"}),
-            "headers": headers
-        }
- 
-    if http_method == "GET":
-        return get_tasks(headers)
-    elif http_method == "POST":
-        return add_task(json.loads(event["body"]), headers)
-    elif http_method == "PUT":
-        return update_task(json.loads(event["body"]), headers)
-    elif http_method == "DELETE":
-        return delete_task(json.loads(event["body"]), headers)
-    elif http_method == "OPTIONS":
-        return {
-            "statusCode": 200,
-            "body": json.dumps({}),
-            "headers": headers
-        }
-    else:
-        return {
-            "statusCode": 400,
-            "body": json.dumps({"error": "Unsupported method"}),
-            "headers": headers
-        }
+            return responses.INVALID_TOKEN
+        cache_token(token, decoded_token)
+    request["user_id"] = decoded_token["user_id"]
 
-def register(event, headers):
+def parse_body(request):
+    """Middleware: decode the JSON request body into request["body"]"""
+    event = request["event"]
+    body = event.get("body") or ""
     try:
-        body = json.loads(event["body"])
-        email = body["email"]
-        password = body["password"]
-    except KeyError:
-        return {
-            "statusCode": 400,
-            "body": json.dumps({"error": "Email and password are required"}),
-            "headers": headers
-        }
+        # API Gateway base64-encodes a body that is not UTF-8 text; it
+        # cannot be JSON, and loads rejects it.
+        if event.get("isBase64Encoded"):
+            body = base64.b64decode(body)
+        body = serializer.loads(body)
+    except ValueError:
+        body = None
+    if not isinstance(body, dict):
+        return responses.BODY_NOT_OBJECT
+    request["body"] = body
 
-    existing_user = users_collection.find_one({"email": email})
-    if existing_user:
-        return {
-            "statusCode": 400,
-            "body": json.dumps({"error": "Email is already registered"}),
-            "headers": headers
-        }
+def require_credentials(request):
+    """Middleware: answer 400 unless the body's email and password are non-empty strings"""
+    body = request["body"]
+    email, password = body.get("email"), body.get("password")
+    # Anything else would reach the users query as an operator ({"$ne": null}).
+    if not (isinstance(email, str) and email and isinstance(password, str) and password):
+        return responses.CREDENTIALS_REQUIRED
+
+def require_task_id(request):
+    """Middleware: answer 400 unless the body's id is a non-empty string"""
+    task_id = request["body"].get("id")
+    # Anything else would reach the tasks filter as an operator ({"$ne": null}).
+    if not (isinstance(task_id, str) and task_id):
+        return responses.TASK_ID_REQUIRED
+
+def preflight():
+    return responses.PREFLIGHT
+
+def register(body):
+    from pymongo.errors import DuplicateKeyError
+    from db import users_collection
+
+    email = body["email"]
+    password = body["password"]
 
     hashed_password = hash_password(password) 
 
@@ -102,148 +181,537 @@ def register(event, headers):
         "created_at": datetime.utcnow()
     }
 
-    result = users_collection.insert_one(user_data)
+    # The email_unique index rejects duplicates, so there is no lookup first.
+    try:
+        result = users_collection.insert_one(user_data)
+    except DuplicateKeyError:
+        return responses.EMAIL_REGISTERED
 
-    expiration = datetime.utcnow() + timedelta(hours=1)
-    payload = {
-        "user_id": str(result.inserted_id),
-        "exp": expiration
-    }
-    token = jwt.encode(payload, SECRET_KEY, algorithm="HS256")
+    token = issue_token(str(result.inserted_id))
+    return responses.json_response(201, {"message": "User registered successfully", "token": token})
 
-    return {
-        "statusCode": 201,
-        "body": json.dumps({"message": "User registered successfully", "token": token}),
-        "headers": headers
-    }
+def login(body):
+    from db import users_collection
 
-def login(event, headers):
-    try:
-        body = json.loads(event["body"])
-        email = body["email"]
-        password = body["password"]
-    except KeyError:
-        return {
-            "statusCode": 400,
-            "body": json.dumps({"error": "Email and password are required"}),
-            "headers": headers
-        }
+    email = body["email"]
+    password = body["password"]
 
     user = users_collection.find_one({"email": email})
     if not user:
-        return {
-            "statusCode": 400,
-            "body": json.dumps({"error": "Invalid email or password"}),
-            "headers": headers
-        }
+        return responses.INVALID_CREDENTIALS
 
-    hashed_password = hash_password(password)  
-    if user["password"] != hashed_password:  
-        return {
-            "statusCode": 400,
-            "body": json.dumps({"error": "Invalid email or password"}),
-            "headers": headers
-        }
+    if not verify_password(password, user["password"]):  
+        return responses.INVALID_CREDENTIALS
 
-    expiration = datetime.utcnow() + timedelta(hours=1)
-    payload = {
-        "user_id": str(user["_id"]),
-        "exp": expiration
-    }
-    token = jwt.encode(payload, SECRET_KEY, algorithm="HS256")
+    # Upgrade legacy SHA-256 hashes, or hashes made at another cost, while
+    # the plain password is at hand.
+    if password_needs_rehash(user["password"]):
+        users_collection.update_one(
+            {"_id": user["_id"]},
+            {"$set": {"password": hash_password(password)}}
+        )
 
-    return {
-        "statusCode": 200,
-        "body": json.dumps({"message": "Login successful", "token": token}),
-        "headers": headers
-    }
+    token = issue_token(str(user["_id"]))
+    return responses.json_response(200, {"message": "Login successful", "token": token})
+
+def get_tasks(event, user_id):
+    from pymongo.errors import OperationFailure
+    from db import tasks_collection
+
+    page, error = task_page(event, user_id)
+    if error:
+        return error
 
-def get_tasks(headers):
+    cache_key = task_cache.page_key(event.get("queryStringParameters"))
+    cached, generation = cached_tasks(user_id, cache_key)
+    if cached:
+        return tasks_response(*cached)
+
+    hint = task_hint(page)
     try:
-        tasks = tasks_collection.find({}, {"_id": 0})
-        return {
-            "statusCode": 200,
-            "body": json.dumps(list(tasks)),
-            "headers": headers
-        }
+        try:
+            encoded = stream_tasks(task_cursor(tasks_collection, page, hint), page["fields"], page["sort_field"], page["limit"])
+        except OperationFailure as e:
+            if hint is None:
+                raise
+            metrics.log_error("Error fetching tasks with index hint, retrying without it", e, hint=hint)
+            encoded = stream_tasks(task_cursor(tasks_collection, page, None), page["fields"], page["sort_field"], page["limit"])
+            skip_hint(hint)
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "body": json.dumps({"error": "Error fetching tasks"}),
-            "headers": headers
+        metrics.log_error("Error fetching tasks", e)
+        return responses.FETCH_TASKS_FAILED
+    cache_tasks(user_id, cache_key, generation, encoded)
+    return tasks_response(*encoded)
+
+def task_hint(page):
+    """The index page's query is hinted to, or None if this container found it missing"""
+    return None if page["hint"] in _missing_hints else page["hint"]
+
+def skip_hint(hint: str):
+    """Run this container's GET tasks queries without hint from now on"""
+    _missing_hints.add(hint)
+
+def task_cursor(tasks_collection, page, hint):
+    """find_raw_batches for a page from task_page, hinted to hint if given"""
+    cursor = tasks_collection.find_raw_batches(page["filter"], page["projection"]).sort(page["sort"])
+    if hint:
+        cursor = cursor.hint(hint)
+    return cursor.limit(page["limit"] + 1).batch_size(min(page["limit"] + 1, TASK_BATCH_SIZE))
+
+def task_page(event, user_id):
+    """Validate GET tasks parameters; returns (page, error response).
+
+    page holds the query (filter, sort, hint, projection) and how to encode
+    the result (fields, sort_field, limit). The query is a range scan on the
+    hinted index: each page costs the same no matter how deep into the
+    user's tasks it starts.
+    """
+    from task_query import build_task_query
+
+    params = event.get("queryStringParameters") or {}
+    try:
+        limit = int(params.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        limit = 0
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        return None, INVALID_LIMIT
+
+    fields = READABLE_TASK_FIELDS
+    if params.get("fields"):
+        # A field asked for twice is written once.
+        fields = tuple(dict.fromkeys(field.strip() for field in params["fields"].split(",")))
+        unknown = [field for field in fields if field not in READABLE_TASK_FIELDS]
+        if unknown:
+            return None, responses.error(400, f"Unknown fields: {', '.join(unknown)}")
+    spec, error = build_task_query(params, user_id)
+    if error:
+        return None, responses.error(400, error)
+
+    # The page cursor is built from the sort field and _id, so they are
+    # always fetched even when the client does not ask for them.
+    projection = dict.fromkeys((*fields, spec["sort_field"], "_id"), 1)
+    return {**spec, "projection": projection, "fields": fields, "limit": limit}, None
+
+def tasks_response(body, next_cursor):
+    """The 200 response for a page of tasks from encode_tasks"""
+    headers = responses.HEADERS
+    if next_cursor:
+        headers = {
+            **headers,
+            "X-Next-Cursor": next_cursor,
+            "Access-Control-Expose-Headers": "X-Next-Cursor"
         }
+    return responses.respond(200, body, headers)
+
+def add_task(body, user_id):
+    from pymongo.errors import DuplicateKeyError
+    from db import tasks_collection
+
+    task, error = task_to_insert(body, user_id)
+    if error:
+        return error
 
-def add_task(body, headers):
     try: 
-        result = tasks_collection.insert_one(body)
-        task_id = str(result.inserted_id)
- 
-        response_task = {
-            "id": task_id,  
-            **body  
-        }
+        tasks_collection.insert_one(task)
+        invalidate_tasks(user_id)
 
-        return {
-            "statusCode": 201,
-            "body": json.dumps(response_task),
-            "headers": headers
-        }
+        return responses.json_response(201, serialize_task(task))
+    except DuplicateKeyError:
+        return responses.TASK_ID_EXISTS
     except Exception as e:
-        print(f"Error adding task: {e}") 
-        return {
-            "statusCode": 500,
-            "body": json.dumps({"error": "Error adding task"}),
-            "headers": headers
-        }
+        metrics.log_error("Error adding task", e)
+        return responses.ADD_TASK_FAILED
 
-def update_task(body, headers):
-    task_id = body.get("id")
-    if not task_id:
-        return {
-            "statusCode": 400,
-            "body": json.dumps({"error": "Task ID is required"}),
-            "headers": headers
-        }
+def update_task(body, user_id):
+    from db import tasks_collection
+
+    update, error = task_update(body, user_id)
+    if error:
+        return error
 
-    result = tasks_collection.update_one({"id": task_id}, {"$set": body})
+    result = tasks_collection.update_one(*update)
 
     if result.matched_count > 0:
-        return {
-            "statusCode": 200,
-            "body": json.dumps({"message": "Task updated successfully"}),
-            "headers": headers
-        }
+        invalidate_tasks(user_id)
+        return responses.TASK_UPDATED
     else:
-        return {
-            "statusCode": 404,
-            "body": json.dumps({"error": "Task not found"}),
-            "headers": headers
-        }
+        return responses.TASK_NOT_FOUND
 
-def delete_task(body, headers):
-    task_id = body.get("id")
-    if not task_id:
-        return {
-            "statusCode": 400,
-            "body": json.dumps({"error": "Task ID is required"}),
-            "headers": headers
-        }
+def delete_task(body, user_id):
+    from db import tasks_collection
 
-    result = tasks_collection.delete_one({"id": task_id})
+    result = tasks_collection.delete_one(task_filter(body, user_id))
 
     if result.deleted_count > 0:
-        return {
-            "statusCode": 200,
-            "body": json.dumps({"message": "Task deleted successfully"}),
-            "headers": headers
-        }
+        invalidate_tasks(user_id)
+        return responses.TASK_DELETED
     else:
-        return {
-            "statusCode": 404,
-            "body": json.dumps({"error": "Task not found"}),
-            "headers": headers
-        }
+        return responses.TASK_NOT_FOUND
+
+# The checks and queries of the write routes, shared with async_handler.py,
+# whose handlers differ only in awaiting MongoDB.
+
+def task_to_insert(body, user_id):
+    """Validate a POST /tasks body into the task to insert; returns (task, error response)"""
+    task, error = clean_task(body)
+    if error:
+        return None, responses.error(400, error)
+    return new_task(task, user_id), None
+
+def task_update(body, user_id):
+    """Validate a PUT /tasks body into update_one's (filter, update); returns (update, error response)"""
+    task, error = clean_task(body)
+    if error:
+        return None, responses.error(400, error)
+    return (task_filter(body, user_id), {"$set": task}), None
+
+def task_filter(body, user_id) -> dict:
+    """The filter for the caller's task named by the body's id (checked by require_task_id)"""
+    return {"id": body["id"], "owner_id": user_id}
+
+def issue_token(user_id: str) -> str:
+    """A bearer token for user_id, valid for an hour"""
+    import jwt
+    payload = {
+        "user_id": user_id,
+        "exp": datetime.utcnow() + timedelta(hours=1)
+    }
+    return jwt.encode(payload, SECRET_KEY, algorithm="HS256")
 
 def hash_password(password: str) -> str:
-    """Generate hash SHA256 for password"""
-    return hashlib.sha256(password.encode('utf-8')).hexdigest()
\ No newline at end of file
+    """Generate a salted scrypt hash for password, encoded as scrypt$cost$salt$hash"""
+    salt = os.urandom(16)
+    digest = _scrypt(password, salt, PASSWORD_HASH_COST)
+    return "$".join((
+        "scrypt",
+        str(PASSWORD_HASH_COST),
+        base64.b64encode(salt).decode("ascii"),
+        base64.b64encode(digest).decode("ascii")
+    ))
+
+def verify_password(password: str, stored: str) -> bool:
+    """Check password against a hash from hash_password or a legacy SHA256 hex digest"""
+    import hashlib
+    import hmac
+    if not stored.startswith("scrypt$"):
+        legacy = hashlib.sha256(password.encode('utf-8')).hexdigest()
+        return hmac.compare_digest(legacy, stored)
+    try:
+        _, cost, salt, digest = stored.split("$")
+        cost = int(cost)
+        salt = base64.b64decode(salt)
+        digest = base64.b64decode(digest)
+    except (ValueError, binascii.Error):
+        return False
+    return hmac.compare_digest(_scrypt(password, salt, cost), digest)
+
+def password_needs_rehash(stored: str) -> bool:
+    """True for legacy hashes and hashes made at a cost other than PASSWORD_HASH_COST"""
+    return not stored.startswith(f"scrypt${PASSWORD_HASH_COST}$")
+
+def _scrypt(password, salt, cost):
+    import hashlib
+    n, r, p = 2 ** cost, 8, 1
+    return hashlib.scrypt(
+        password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+        maxmem=256 * r * n, dklen=32
+    )
+
+def token_verifier():
+    """JWT verifier bound to SECRET_KEY, built once per container.
+
+    jwt.verifier is only in the vendored jwt package: with a PyPI PyJWT in
+    its place this raises AttributeError on the first authenticated request.
+    """
+    global _token_verifier
+    if _token_verifier is None:
+        import jwt
+        _token_verifier = jwt.verifier(SECRET_KEY, algorithms=["HS256"])
+    return _token_verifier
+
+def cached_token(token: str):
+    """Return the claims of an already verified, unexpired token, or None"""
+    import hashlib
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    entry = _verified_tokens.get(key)
+    if entry is None:
+        return None
+    claims, exp = entry
+    if time.time() >= exp:
+        del _verified_tokens[key]
+        return None
+    _verified_tokens.move_to_end(key)
+    return claims
+
+def cache_token(token: str, claims: dict):
+    """Remember verified claims until the token expires, evicting the least recently used"""
+    import hashlib
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)):
+        return
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    _verified_tokens[key] = (claims, exp)
+    _verified_tokens.move_to_end(key)
+    while len(_verified_tokens) > TOKEN_CACHE_SIZE:
+        _verified_tokens.popitem(last=False)
+
+def cached_tasks(user_id: str, key: str):
+    """(page, generation) from the task cache, page None on a miss; see task_cache.py"""
+    if _task_cache is None:
+        return None, None
+    return _task_cache.lookup(user_id, key)
+
+def cache_tasks(user_id: str, key: str, generation, page):
+    """Keep an encoded page (body, next cursor) looked up under generation"""
+    if _task_cache is not None:
+        _task_cache.store(user_id, key, generation, page)
+
+def invalidate_tasks(user_id: str):
+    """Drop user_id's cached pages, after a write to their tasks"""
+    if _task_cache is not None:
+        _task_cache.invalidate(user_id)
+
+def task_cache_blocks() -> bool:
+    """Whether the task cache functions wait on the network (a shared store)"""
+    return _task_cache is not None and _task_cache.shared
+
+def stream_tasks(cursor, fields, sort_field, limit):
+    """encode_tasks over a raw batch cursor, which it closes.
+
+    Each batch is written out as JSON as soon as the cursor yields it, so
+    only the current batch is held at once.
+    """
+    try:
+        return encode_tasks(cursor, fields, sort_field, limit)
+    finally:
+        cursor.close()
+
+def encode_tasks(batches, fields, sort_field, limit):
+    """Encode up to limit tasks from raw BSON batches as a JSON array.
+
+    Tasks go to JSON straight from their BSON bytes (see raw_json.py) and
+    are never decoded into dicts. Returns the body and the cursor for the
+    next page (None on the last one).
+    """
+    import bson
+    from raw_json import write_page
+    from task_query import encode_cursor
+
+    out = io.StringIO()
+    out.write("[")
+    count, last, more = write_page(out, batches, fields, limit)
+    out.write("]")
+
+    next_cursor = None
+    if more:
+        # Only the last task of the page is decoded, for its sort key.
+        last_task = bson.decode(last)
+        next_cursor = encode_cursor(last_task[sort_field], last_task["_id"])
+    return out.getvalue(), next_cursor
+
+def batch_tasks(body, user_id):
+    """Apply a list of create/update/delete operations in one bulk_write.
+
+    The body is {"operations": [{"action": "create" | "update" | "delete",
+    "task": {...}}, ...]}. Each operation gets its own entry in "results";
+    invalid operations are reported without being sent. The write is
+    unordered unless two operations touch the same task id. bulk_write only
+    reports totals, so the tasks that updates and deletes name are looked
+    up first, in one query, and those that do not exist get a 404 without
+    being sent. A task deleted between that query and the write still
+    reports 200; the "matched" and "deleted" totals are what was applied.
+    """
+    from pymongo.errors import BulkWriteError
+    from db import tasks_collection
+
+    batch, error = plan_batch(body, user_id)
+    if error:
+        return error
+
+    query = existing_tasks_query(batch, user_id)
+    if query:
+        try:
+            skip_missing(batch, [task["id"] for task in tasks_collection.find(query, {"_id": 0, "id": 1})])
+        except Exception as e:
+            metrics.log_error("Error applying batch", e)
+            return responses.BATCH_FAILED
+
+    details = None
+    if batch["requests"]:
+        try:
+            result = tasks_collection.bulk_write(batch["requests"], ordered=batch["ordered"])
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+        except Exception as e:
+            metrics.log_error("Error applying batch", e)
+            return responses.BATCH_FAILED
+        finally:
+            # Any part of the batch may have been applied.
+            invalidate_tasks(user_id)
+    return batch_response(batch, details)
+
+def plan_batch(body, user_id):
+    """Validate a /tasks/batch body into bulk_write requests; returns (batch, error response).
+
+    batch["results"] holds the response entry of each operation so far,
+    batch["requests"] the writes to send, batch["request_indexes"] the
+    operation each one came from and batch["targets"] its (action, task id).
+    """
+    from pymongo import InsertOne, UpdateOne, DeleteOne
+
+    operations = body.get("operations")
+    if not isinstance(operations, list) or not 0 < len(operations) <= MAX_BATCH_SIZE:
+        return None, INVALID_BATCH
+
+    results = [None] * len(operations)
+    requests = []
+    request_indexes = []
+    targets = []
+    for index, operation in enumerate(operations):
+        action = operation.get("action") if isinstance(operation, dict) else None
+        task = operation.get("task") if isinstance(operation, dict) else None
+        if action not in ("create", "update", "delete") or not isinstance(task, dict):
+            results[index] = {"status": 400, "error": "Each operation needs an action (create, update or delete) and a task"}
+            continue
+        task, error = clean_task(task)
+        if not error and action != "create" and not task.get("id"):
+            error = "Task ID is required"
+        if error:
+            results[index] = {"status": 400, "error": error}
+            continue
+
+        if action == "create":
+            task = new_task(task, user_id)
+            requests.append(InsertOne(task))
+            results[index] = {"status": 201, "task": serialize_task(task)}
+        elif action == "update":
+            requests.append(UpdateOne({"id": task["id"], "owner_id": user_id}, {"$set": task}))
+            results[index] = {"status": 200, "id": task["id"]}
+        else:
+            requests.append(DeleteOne({"id": task["id"], "owner_id": user_id}))
+            results[index] = {"status": 200, "id": task["id"]}
+        request_indexes.append(index)
+        targets.append((action, task["id"]))
+
+    # Operations on distinct tasks are independent, so the server may
+    # apply them in any order and carry on past a failed one.
+    ordered = len({task_id for _, task_id in targets}) < len(targets)
+    return {
+        "results": results,
+        "requests": requests,
+        "request_indexes": request_indexes,
+        "targets": targets,
+        "ordered": ordered
+    }, None
+
+def existing_tasks_query(batch, user_id):
+    """The find() filter for the user's tasks that a batch updates or deletes, or None"""
+    task_ids = sorted({task_id for action, task_id in batch["targets"] if action != "create"})
+    if not task_ids:
+        return None
+    return {"id": {"$in": task_ids}, "owner_id": user_id}
+
+def skip_missing(batch, existing_ids):
+    """Answer 404 for the batch's updates and deletes of tasks that do not
+    exist, given the ids existing_tasks_query found, and drop them from it.
+
+    Operations are replayed in order, so a task created earlier in the
+    batch exists for a later one and a deleted task no longer does.
+    """
+    existing = set(existing_ids)
+    kept = []
+    for request, index, (action, task_id) in zip(batch["requests"], batch["request_indexes"], batch["targets"]):
+        if action == "create":
+            existing.add(task_id)
+        elif task_id not in existing:
+            batch["results"][index] = {"status": 404, "error": "Task not found"}
+            continue
+        elif action == "delete":
+            existing.discard(task_id)
+        kept.append((request, index, (action, task_id)))
+    batch["requests"] = [request for request, _, _ in kept]
+    batch["request_indexes"] = [index for _, index, _ in kept]
+    batch["targets"] = [target for _, _, target in kept]
+
+def batch_response(batch, details):
+    """The response for a planned batch, given bulk_write's result details (None if nothing was sent)"""
+    results = batch["results"]
+    request_indexes = batch["request_indexes"]
+    counts = {"inserted": 0, "matched": 0, "modified": 0, "deleted": 0}
+    if details is not None:
+        for write_error in details["writeErrors"]:
+            index = request_indexes[write_error["index"]]
+            if write_error["code"] == 11000:
+                error = "Task ID already exists"
+            else:
+                error = "Error applying operation"
+            results[index] = {"status": 400, "error": error}
+        if batch["ordered"] and details["writeErrors"]:
+            # An ordered bulk write stops at the first error.
+            first_error = details["writeErrors"][0]["index"]
+            for index in request_indexes[first_error + 1:]:
+                results[index] = {"status": 400, "error": "Not applied after an earlier error"}
+        counts = {
+            "inserted": details["nInserted"],
+            "matched": details["nMatched"],
+            "modified": details["nModified"],
+            "deleted": details["nRemoved"]
+        }
+
+    return responses.json_response(200, {"results": results, **counts})
+
+def new_task(task: dict, user_id: str) -> dict:
+    """Add the server-assigned fields to a cleaned task before it is inserted"""
+    from bson import ObjectId
+    task["_id"] = ObjectId()
+    task.setdefault("id", str(task["_id"]))
+    task["owner_id"] = user_id
+    # BSON dates hold milliseconds: truncate now, so the response shows the
+    # createdAt that GET will return.
+    now = datetime.utcnow()
+    task["createdAt"] = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    return task
+
+def clean_task(body: dict):
+    """Keep only TASK_FIELDS from a request body; returns (task, error)"""
+    task = {}
+    for field, max_length in TASK_FIELDS.items():
+        if field not in body:
+            continue
+        value = body[field]
+        if not isinstance(value, str) or len(value) > max_length:
+            return None, f"{field} must be a string of at most {max_length} characters"
+        task[field] = value
+    return task, None
+
+def serialize_task(task: dict, fields=READABLE_TASK_FIELDS) -> dict:
+    """Shape a stored task for the response, keeping only the requested fields.
+
+    createdAt stays a datetime; serializer.dumps writes it as ISO 8601.
+    """
+    return {field: task[field] for field in fields if field in task}
+
+# Last path segment -> route resource; any other path is the task list.
+RESOURCES = {
+    "login": "/login",
+    "register": "/register",
+    "batch": "/tasks/batch",
+    "delete": "/tasks/delete"
+}
+
+# Handlers are named rather than referenced: async_handler.py binds the
+# same routes and middleware to its coroutines of the same names.
+ROUTES = [
+    ("OPTIONS", ANY_RESOURCE, "preflight", ()),
+    ("POST", "/login", "login", (parse_body, require_credentials)),
+    ("POST", "/register", "register", (parse_body, require_credentials)),
+    ("GET", "/tasks", "get_tasks", (authenticate,)),
+    ("POST", "/tasks", "add_task", (authenticate, parse_body)),
+    ("PUT", "/tasks", "update_task", (authenticate, parse_body, require_task_id)),
+    ("DELETE", "/tasks", "delete_task", (authenticate, parse_body, require_task_id)),
+    # docs/openapi.yaml publishes delete as POST /delete.
+    ("POST", "/tasks/delete", "delete_task", (authenticate, parse_body, require_task_id)),
+    ("POST", "/tasks/batch", "batch_tasks", (authenticate, parse_body)),
+]
+ROUTE_TABLE = compile_routes(bind_routes(ROUTES, globals()))
@@ -0,0 +1,133 @@
+"""Per-invocation timings, logged as one CloudWatch Embedded Metric Format line.
+
+lambda_handler starts an invocation, the code it calls adds to it (time in
+jwt decode through timed(), Mongo command time through the CommandListener
+in mongo_settings.py, task cache hits and misses from task_cache.py), and
+emit() prints the JSON line that CloudWatch Logs turns into metrics with a
+"route" dimension. The current invocation is held in a
+context variable, so concurrent invocations in one process (the local dev
+server) each get their own numbers.
+
+log() and log_error() print other events (errors, connection setup) as
+JSON lines too, tagged with the route and request id of the invocation
+they happen in.
+
+Set METRICS_LOG=off to stop the metric lines being printed; log lines are
+always printed.
+"""
+import contextvars
+import json
+import os
+import time
+from contextlib import contextmanager
+
+NAMESPACE = os.getenv("METRICS_NAMESPACE", "TaskManager")
+ENABLED = os.getenv("METRICS_LOG", "on") != "off"
+
+# Metric name -> CloudWatch unit
+METRICS = {
+    "Duration": "Milliseconds",
+    "JwtTime": "Milliseconds",
+    "MongoTime": "Milliseconds",
+    "MongoCommands": "Count",
+    "TaskCacheHits": "Count",
+    "TaskCacheMisses": "Count",
+    "BytesIn": "Bytes",
+    "BytesOut": "Bytes",
+    "ColdStart": "Count"
+}
+
+_invocation = contextvars.ContextVar("invocation", default=None)
+
+def start_invocation(route=None, request_id=None) -> dict:
+    """Begin collecting timings for the invocation running in this context"""
+    invocation = {
+        "started": time.perf_counter(),
+        "route": route,
+        "requestId": request_id,
+        "JwtTime": 0.0,
+        "MongoTime": 0.0,
+        "MongoCommands": 0,
+        "TaskCacheHits": 0,
+        "TaskCacheMisses": 0
+    }
+    _invocation.set(invocation)
+    return invocation
+
+@contextmanager
+def timed(metric: str):
+    """Add the wall time of the with block to metric, in milliseconds"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        invocation = _invocation.get()
+        if invocation is not None:
+            invocation[metric] += (time.perf_counter() - started) * 1000
+
+def record_mongo_command(duration_micros: int):
+    """Count one Mongo command and its round trip against the current invocation"""
+    invocation = _invocation.get()
+    if invocation is not None:
+        invocation["MongoTime"] += duration_micros / 1000
+        invocation["MongoCommands"] += 1
+
+def record_cache(hit: bool):
+    """Count one task cache lookup against the current invocation"""
+    invocation = _invocation.get()
+    if invocation is not None:
+        invocation["TaskCacheHits" if hit else "TaskCacheMisses"] += 1
+
+def emit(invocation: dict, status: int, bytes_in: int, bytes_out: int, cold: bool):
+    """Print the EMF log line for a finished invocation"""
+    _invocation.set(None)
+    if not ENABLED:
+        return
+    values = {
+        "Duration": round((time.perf_counter() - invocation["started"]) * 1000, 3),
+        "JwtTime": round(invocation["JwtTime"], 3),
+        "MongoTime": round(invocation["MongoTime"], 3),
+        "MongoCommands": invocation["MongoCommands"],
+        "TaskCacheHits": invocation["TaskCacheHits"],
+        "TaskCacheMisses": invocation["TaskCacheMisses"],
+        "BytesIn": bytes_in,
+        "BytesOut": bytes_out,
+        "ColdStart": int(cold)
+    }
+    print(json.dumps({
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": NAMESPACE,
+                "Dimensions": [["route"]],
+                "Metrics": [{"Name": name, "Unit": unit} for name, unit in METRICS.items()]
+            }]
+        },
+        "route": invocation["route"],
+        "status": status,
+        "cold": cold,
+        "requestId": invocation["requestId"],
+        **values
+    }))
+
+def log(level: str, message: str, **fields):
+    """Print one JSON log line, tagged with the current invocation's route and request id"""
+    invocation = _invocation.get() or {}
+    print(json.dumps({
+        "timestamp": int(time.time() * 1000),
+        "level": level,
+        "message": message,
+        "route": invocation.get("route"),
+        "requestId": invocation.get("requestId"),
+        **fields
+    }, default=str))
+
+def log_error(message: str, error: BaseException, **fields):
+    """log() an exception at level "error" """
+    log("error", message, errorType=type(error).__name__, error=str(error), **fields)
+
+def utf8_length(text) -> int:
+    """Size in bytes of a request or response body"""
+    if not text:
+        return 0
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
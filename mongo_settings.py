@@ -0,0 +1,55 @@
+"""Connection settings shared by the Mongo clients in db.py and async_db.py.
+
+Importing this module creates no client, so either one can be loaded
+without the other.
+"""
+import os
+from urllib.parse import parse_qsl, urlsplit
+
+from pymongo import monitoring
+
+import metrics
+
+MONGO_URI = os.getenv('MONGO_URI')
+
+class CommandTimer(monitoring.CommandListener):
+    """Adds every command's round trip to the current invocation's metrics"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        metrics.record_mongo_command(event.duration_micros)
+
+    def failed(self, event):
+        metrics.record_mongo_command(event.duration_micros)
+
+def client_options(uri, max_pool_size: int = 1) -> dict:
+    """Keyword arguments for a client of uri, minus options the URI sets itself.
+
+    max_pool_size is the default for MONGO_MAX_POOL_SIZE: the number of
+    requests one process works on at once. A Lambda container handles one
+    at a time, so one connection is all it can use; minPoolSize keeps it
+    open, and prewarm() opens it during the init phase. The timeouts fail a
+    request while API Gateway (29 s) is still waiting, instead of after the
+    driver's 30 s default. Set MONGO_COMPRESSORS (e.g. "zstd,zlib") to
+    compress wire traffic; zstd and snappy need their packages installed,
+    zlib is built in.
+    """
+    options = {
+        "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", str(max_pool_size))),
+        "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "1")),
+        "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "3000")),
+    }
+    if os.getenv("MONGO_COMPRESSORS"):
+        options["compressors"] = os.getenv("MONGO_COMPRESSORS")
+    in_uri = {name.lower() for name, _ in parse_qsl(urlsplit(uri or "").query)}
+    return {name: value for name, value in options.items() if name.lower() not in in_uri}
+
+def cache_srv_lookups(uri):
+    """Send SRV and TXT lookups for a mongodb+srv:// uri through dns_cache.py,
+    whose cache outlives the client and the process"""
+    if uri and uri.startswith("mongodb+srv://"):
+        import dns_cache
+        dns_cache.install()
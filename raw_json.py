@@ -0,0 +1,65 @@
+"""Raw BSON task batches to response JSON.
+
+GET tasks reads with find_raw_batches, so the driver hands over each
+cursor batch as the concatenated BSON of its documents, undecoded, and
+this module writes the requested fields of each task straight to JSON
+text. With the _raw_json C extension (built by
+scripts/build_extensions.py) no dict, RawBSONDocument or other Python
+object is created per task, and the output is the same text
+serializer.dumps would produce. Without it, or for a task holding a value
+the extension leaves to Python (doubles, embedded documents, ...), the
+task is decoded and encoded the usual way.
+"""
+import bson
+
+import serializer
+
+try:
+    from _raw_json import documents_to_json as _documents_to_json
+except ImportError:
+    _documents_to_json = None
+
+# Fields the extension writes per call (MAX_FIELDS in _raw_json.c); more
+# than that are left to Python.
+MAX_FIELDS = 32
+
+def has_c() -> bool:
+    return _documents_to_json is not None
+
+def write_page(out, batches, fields, limit: int):
+    """Write up to limit tasks from raw cursor batches to out.
+
+    Each task is written as a JSON object of fields (plain identifiers, like
+    those in READABLE_TASK_FIELDS, in that order), separated by commas.
+    Returns (count, last, more): how many were written, the BSON of the last
+    one and whether the cursor holds more tasks after it.
+    """
+    keys = tuple(field.encode("utf-8") for field in fields)
+    accelerated = _documents_to_json is not None and len(keys) <= MAX_FIELDS
+    count = 0
+    last = None
+    for batch in batches:
+        position = 0
+        while position < len(batch):
+            if count == limit:
+                return count, last, True
+            if accelerated:
+                text, converted, end, last_start = _documents_to_json(batch, keys, position, limit - count)
+                if converted:
+                    if count:
+                        out.write(",")
+                    out.write(text)
+                    count += converted
+                    last = batch[last_start:end]
+                    position = end
+                    continue
+            # No accelerator, or it stopped at a task it leaves to Python.
+            size = int.from_bytes(batch[position:position + 4], "little")
+            last = batch[position:position + size]
+            task = bson.decode(last)
+            if count:
+                out.write(",")
+            out.write(serializer.dumps({field: task[field] for field in fields if field in task}))
+            count += 1
+            position += size
+    return count, last, False
@@ -0,0 +1,60 @@
+"""Proxy responses for lambda_handler.
+
+The CORS headers are built once, and constant responses ("Task not
+found", the preflight "{}", ...) are JSON-encoded once at import; handlers
+return the same response dicts on every invocation instead of rebuilding
+and re-encoding them. Those dicts are shared: never mutate a response,
+copy it. See benchmarks/static_responses.py.
+"""
+import serializer
+
+HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization"
+}
+
+def respond(status: int, body: str, headers: dict = HEADERS) -> dict:
+    """Response with an already encoded body"""
+    return {
+        "statusCode": status,
+        "body": body,
+        "headers": headers
+    }
+
+def json_response(status: int, payload, headers: dict = HEADERS) -> dict:
+    return respond(status, serializer.dumps(payload), headers)
+
+def error(status: int, message: str) -> dict:
+    return respond(status, serializer.dumps({"error": message}))
+
+def constant(status: int, payload) -> dict:
+    """Encode a response once, for reuse by every invocation"""
+    return json_response(status, payload)
+
+def constant_error(status: int, message: str) -> dict:
+    return constant(status, {"error": message})
+
+PREFLIGHT = constant(200, {})
+UNSUPPORTED_METHOD = constant_error(400, "Unsupported method")
+HEALTHY = constant(200, {"status": "ok"})
+
+TOKEN_REQUIRED = constant_error(401, "Authorization token is required")
+TOKEN_EXPIRED = constant_error(401, "Token has expired")
+INVALID_TOKEN = constant_error(401, "Invalid token")
+
+BODY_NOT_OBJECT = constant_error(400, "Request body must be a JSON object")
+BODY_TOO_LARGE = constant_error(413, "Request body is too large")
+CREDENTIALS_REQUIRED = constant_error(400, "Email and password are required")
+EMAIL_REGISTERED = constant_error(400, "Email is already registered")
+INVALID_CREDENTIALS = constant_error(400, "Invalid email or password")
+
+TASK_ID_REQUIRED = constant_error(400, "Task ID is required")
+TASK_ID_EXISTS = constant_error(400, "Task ID already exists")
+TASK_NOT_FOUND = constant_error(404, "Task not found")
+TASK_UPDATED = constant(200, {"message": "Task updated successfully"})
+TASK_DELETED = constant(200, {"message": "Task deleted successfully"})
+
+FETCH_TASKS_FAILED = constant_error(500, "Error fetching tasks")
+ADD_TASK_FAILED = constant_error(500, "Error adding task")
+BATCH_FAILED = constant_error(500, "Error applying batch")
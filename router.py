@@ -0,0 +1,74 @@
+"""Route table compilation and dispatch for lambda_handler.
+
+Routes are declared as (method, resource, handler, middleware) tuples and
+compiled once, at import, into a dict keyed by (method, resource), so a
+request costs one lookup however many routes there are. lambda_function.py
+declares its routes with handler names, which bind_routes resolves against
+a module's handlers, so async_handler.py serves the same declaration with
+its coroutines.
+
+Each middleware is called as middleware(request) before the handler.
+request starts as {"event": event}; middleware may add entries to it (the
+user id, the parsed body) or return a response to stop there. The handler
+is then called with the request entries named by its parameters.
+dispatch_async is the same for tables whose handlers are coroutine
+functions (async_handler.py); middleware stays synchronous.
+"""
+
+ANY_RESOURCE = "*"
+
+def bind_routes(declarations, handlers: dict):
+    """Route declarations naming their handlers, with the functions of those names in handlers"""
+    return [
+        (method, resource, handlers[name], middleware)
+        for method, resource, name, middleware in declarations
+    ]
+
+def compile_routes(routes):
+    """Build the dispatch table for a list of route declarations"""
+    table = {}
+    for method, resource, handler, middleware in routes:
+        if (method, resource) in table:
+            raise ValueError(f"Duplicate route: {method} {resource}")
+        code = handler.__code__
+        params = code.co_varnames[:code.co_argcount]
+        table[(method, resource)] = (handler, tuple(middleware), params)
+    return table
+
+def resource_for(path: str, resources: dict, default: str) -> str:
+    """Map a request path to a route resource by its last segment.
+
+    The API can be mounted under any stage or base path, so only the final
+    segment identifies the route; paths ending in anything else map to
+    default.
+    """
+    segment = path.rstrip("/").rsplit("/", 1)[-1]
+    return resources.get(segment, default)
+
+def dispatch(table, method: str, resource: str, event: dict):
+    """Run the route for (method, resource); returns None when there is none"""
+    route = table.get((method, resource)) or table.get((method, ANY_RESOURCE))
+    if route is None:
+        return None
+    handler, middleware, params = route
+
+    request = {"event": event}
+    for step in middleware:
+        response = step(request)
+        if response is not None:
+            return response
+    return handler(**{name: request[name] for name in params})
+
+async def dispatch_async(table, method: str, resource: str, event: dict):
+    """dispatch, awaiting the handler"""
+    route = table.get((method, resource)) or table.get((method, ANY_RESOURCE))
+    if route is None:
+        return None
+    handler, middleware, params = route
+
+    request = {"event": event}
+    for step in middleware:
+        response = step(request)
+        if response is not None:
+            return response
+    return await handler(**{name: request[name] for name in params})
@@ -0,0 +1,41 @@
+"""Run an ASGI application locally through server.py, in one process.
+
+Runs async_handler.app, or any other ASGI app given as module:attribute,
+on uvicorn as the container image does, with a line printed per request:
+
+    SECRET_KEY=dev python scripts/asgi_server.py --fake-db [--port 3000] [--app async_handler:app]
+
+Without --fake-db the app uses MONGO_URI as usual; with it async_db.py runs
+against the in-process stand-in in fake_mongo.py, whose data lives in this
+one process (so there is no --workers here; see server.py for that).
+"""
+import argparse
+import importlib
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--app", default="async_handler:app", help="module:attribute of the ASGI app")
+    parser.add_argument("--fake-db", action="store_true", help="use the in-process MongoDB stand-in")
+    args = parser.parse_args()
+
+    if args.fake_db:
+        import fake_mongo
+        fake_mongo.install()
+    # One worker, so the app is imported here, after fake_mongo.install().
+    module, _, attribute = args.app.partition(":")
+    app = getattr(importlib.import_module(module), attribute or "app")
+    server.run(app, args.host, args.port, workers=1, access_log=True)
+
+
+if __name__ == "__main__":
+    main()
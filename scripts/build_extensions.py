@@ -0,0 +1,55 @@
+"""Build the bson, pymongo and _raw_json C extensions in place for this interpreter.
+
+The vendored pymongo ships only Windows builds (*.pyd), so on the Lambda
+image bson and pymongo.message fall back to pure Python. This compiles the
+C sources that are already in the tree next to them, along with
+_raw_json.c, the BSON-to-JSON accelerator used by raw_json.py:
+
+    python scripts/build_extensions.py
+
+Run it with the same Python and platform as the deployment target (the
+deploy workflow runs it inside the Lambda base image). The built *.so files
+are git-ignored and picked up automatically on import; check with
+``python -c "import bson, pymongo; print(bson.has_c(), pymongo.has_c())"``.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+from setuptools import Extension
+from setuptools.dist import Distribution
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BSON_SOURCES = ["bson/_cbsonmodule.c", "bson/time64.c", "bson/buffer.c"]
+
+EXTENSIONS = [
+    Extension("bson._cbson", include_dirs=["bson"], sources=BSON_SOURCES),
+    Extension(
+        "pymongo._cmessage",
+        include_dirs=["bson"],
+        sources=["pymongo/_cmessagemodule.c"] + BSON_SOURCES,
+    ),
+    Extension("_raw_json", sources=["_raw_json.c"]),
+]
+
+
+def main():
+    os.chdir(ROOT)
+    dist = Distribution({"name": "task-manager-extensions", "ext_modules": EXTENSIONS})
+    cmd = dist.get_command_obj("build_ext")
+    cmd.inplace = True
+    with tempfile.TemporaryDirectory() as build_temp:
+        cmd.build_temp = build_temp
+        cmd.ensure_finalized()
+        cmd.run()
+
+    # Import in a fresh process so the new extensions are actually loaded.
+    check = "import bson, pymongo, raw_json, sys; sys.exit(not (bson.has_c() and pymongo.has_c() and raw_json.has_c()))"
+    if subprocess.run([sys.executable, "-c", check]).returncode != 0:
+        sys.exit("C extensions were built but do not import")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Local HTTP server in front of lambda_function.lambda_handler.
+
+Each HTTP request is turned into an API Gateway proxy event and handed to
+one of N warm "containers": separate imports of lambda_function, each with
+its own module state (token cache, task cache, JWT verifier), serving one
+request at a time like a Lambda execution environment. Requests beyond N
+wait for a free container.
+
+    SECRET_KEY=dev python scripts/dev_server.py --fake-db [--fake-redis] [--port 3000] [--containers 4]
+
+Without --fake-db the handlers use MONGO_URI as usual; with it they run
+against the in-process stand-in in fake_mongo.py. With TASK_CACHE_TTL set
+each container keeps its own task cache; --fake-redis instead gives them
+one shared store (the in-process stand-in in fake_redis.py), as
+TASK_CACHE_REDIS_URL would.
+"""
+import argparse
+import base64
+import importlib.util
+import json
+import os
+import queue
+import sys
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+class ContainerPool:
+    """Warm copies of lambda_function, checked out one request at a time"""
+
+    def __init__(self, size):
+        self.size = size
+        self._idle = queue.Queue()
+        for number in range(size):
+            self._idle.put(load_container(number))
+
+    def invoke(self, event):
+        container = self._idle.get()
+        try:
+            return container.lambda_handler(event, None)
+        finally:
+            self._idle.put(container)
+
+
+def load_container(number):
+    """Import lambda_function afresh under its own module name"""
+    spec = importlib.util.spec_from_file_location(
+        f"lambda_function_container_{number}", os.path.join(ROOT, "lambda_function.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def proxy_event(method, target, headers, body):
+    """Build the API Gateway proxy event for one HTTP request"""
+    url = urlsplit(target)
+    query = parse_qs(url.query, keep_blank_values=True)
+    # Like API Gateway, pass a body that is not UTF-8 text base64-encoded.
+    try:
+        text, is_base64 = body.decode("utf-8"), False
+    except UnicodeDecodeError:
+        text, is_base64 = base64.b64encode(body).decode("ascii"), True
+    return {
+        "httpMethod": method,
+        "path": url.path,
+        "headers": dict(headers.items()),
+        "multiValueHeaders": {name: headers.get_all(name) for name in headers.keys()},
+        "queryStringParameters": {k: v[-1] for k, v in query.items()} or None,
+        "multiValueQueryStringParameters": query or None,
+        "body": text or None,
+        "isBase64Encoded": is_base64,
+        "requestContext": {
+            "requestId": str(uuid.uuid4()),
+            "stage": "local",
+            "httpMethod": method,
+            "path": url.path,
+        },
+    }
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; with Nagle on, the body
+    # waits for the client's delayed ACK and every response gains ~40 ms.
+    disable_nagle_algorithm = True
+
+    def _invoke(self):
+        started = time.perf_counter()
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        event = proxy_event(self.command, self.path, self.headers, body)
+        try:
+            response = self.server.pool.invoke(event)
+        except Exception as e:
+            print(f"Unhandled error in lambda_handler: {e!r}")
+            response = {"statusCode": 502, "headers": {}, "body": json.dumps({"message": "Internal server error"})}
+
+        payload = (response.get("body") or "").encode("utf-8")
+        self.send_response(response["statusCode"])
+        for name, value in (response.get("headers") or {}).items():
+            self.send_header(name, str(value))
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        if self.server.verbose:
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"{self.command} {self.path} {response['statusCode']} {elapsed:.1f} ms")
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_OPTIONS = _invoke
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(pool, host="127.0.0.1", port=3000, verbose=True):
+    server = ThreadingHTTPServer((host, port), ProxyHandler)
+    server.daemon_threads = True
+    server.pool = pool
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--containers", type=int, default=4)
+    parser.add_argument("--fake-db", action="store_true", help="use the in-process MongoDB stand-in")
+    parser.add_argument("--fake-redis", action="store_true", help="share the task cache through the in-process Redis stand-in")
+    args = parser.parse_args()
+
+    # The containers share one db module, and with it one connection pool.
+    os.environ.setdefault("MONGO_MAX_POOL_SIZE", str(args.containers))
+    if args.fake_db:
+        import fake_mongo
+        fake_mongo.install()
+    if args.fake_redis:
+        import fake_redis
+        fake_redis.install()
+    server = make_server(ContainerPool(args.containers), args.host, args.port)
+    print(f"Serving lambda_handler on http://{args.host}:{args.port} with {args.containers} containers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
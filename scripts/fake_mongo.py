@@ -0,0 +1,451 @@
+"""In-process stand-in for MongoDB, for running the handlers locally.
+
+Implements the part of the pymongo Collection API the handlers use, with
+the same result and error types, so lambda_handler can run locally (see
+dev_server.py and benchmarks/load_test.py) without a MongoDB server.
+Documents are stored BSON-encoded and decoded on every read, like a real
+driver round trip, and unique indexes declared in db.INDEXES are enforced.
+Query support covers the operators the handlers send: equality, $gt,
+$gte, $lt, $lte, $ne, $in, $exists, $regex and $or/$and. FakeAsyncClient
+offers the same through the AsyncMongoClient API, for async_db.py.
+
+Set FAKE_MONGO_LATENCY_MS to make every operation take that long, like a
+network round trip: the sync fakes sleep, the async ones await.
+"""
+import asyncio
+import copy
+import os
+import re
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import bson
+from bson import ObjectId
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.results import BulkWriteResult, DeleteResult, InsertOneResult, UpdateResult
+
+_MISSING = object()
+
+# Simulated round trip of each operation, seconds.
+LATENCY = float(os.getenv("FAKE_MONGO_LATENCY_MS", "0")) / 1000
+
+# host -> {database name: FakeDatabase}: clients of one host see the same
+# data, as they would on a server.
+_SERVERS = {}
+
+
+def install():
+    """Import db.py and async_db.py against in-process fake collections.
+
+    They run unchanged with FakeClient in place of pymongo.MongoClient and
+    FakeAsyncClient in place of pymongo.AsyncMongoClient, so the indexes
+    db.py declares are created on the fakes; afterwards `from db import ...`
+    in the handlers gets the fake collections.
+    """
+    import pymongo
+
+    sys.modules.pop("db", None)
+    sys.modules.pop("async_db", None)
+    _SERVERS.clear()
+    real_clients = pymongo.MongoClient, pymongo.AsyncMongoClient
+    pymongo.MongoClient, pymongo.AsyncMongoClient = FakeClient, FakeAsyncClient
+    try:
+        import db
+        import async_db
+    finally:
+        pymongo.MongoClient, pymongo.AsyncMongoClient = real_clients
+    return db
+
+
+class FakeClient:
+    def __init__(self, host=None, **options):
+        # The part of MongoClient.options that db.py reads.
+        self.options = SimpleNamespace(
+            pool_options=SimpleNamespace(min_pool_size=options.get("minPoolSize", 0))
+        )
+        self._databases = _SERVERS.setdefault(host, {})
+        self._latency = LATENCY
+
+    def get_database(self, name):
+        if name not in self._databases:
+            self._databases[name] = FakeDatabase(name, self._latency)
+        return self._databases[name]
+
+    @property
+    def admin(self):
+        return self.get_database("admin")
+
+    def close(self):
+        pass
+
+
+class FakeDatabase:
+    def __init__(self, name, latency=0):
+        self.name = name
+        self._latency = latency
+        self._collections = {}
+
+    def get_collection(self, name):
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(name, self._latency)
+        return self._collections[name]
+
+    def command(self, command, *args, **kwargs):
+        if command in ("ping", "hello", "isMaster"):
+            return {"ok": 1.0}
+        raise OperationFailure(f"Unsupported command: {command}")
+
+
+class FakeCollection:
+    def __init__(self, name, latency=0):
+        self.name = name
+        self._latency = latency
+        # _id -> (decoded document used for matching, BSON returned to readers)
+        self._docs = {}
+        self._indexes = {"_id_": {"key": {"_id": 1}, "unique": True}}
+        # unique index name -> {value: _id}
+        self._unique = {}
+        self._lock = threading.Lock()
+
+    def create_indexes(self, indexes):
+        with self._lock:
+            for index in indexes:
+                document = index.document
+                self._indexes[document["name"]] = document
+                if document.get("unique") and len(document["key"]) == 1:
+                    self._unique[document["name"]] = {}
+                    for stored, _ in self._docs.values():
+                        self._index_unique(stored)
+        return [index.document["name"] for index in indexes]
+
+    def insert_one(self, document):
+        self._round_trip()
+        with self._lock:
+            self._insert(document)
+        return InsertOneResult(document["_id"], True)
+
+    def find(self, filter=None, projection=None):
+        return FakeCursor(self, filter or {}, projection)
+
+    def find_raw_batches(self, filter=None, projection=None):
+        return FakeCursor(self, filter or {}, projection, raw_batches=True)
+
+    def find_one(self, filter=None, projection=None):
+        for document in self.find(filter, projection).limit(1):
+            return document
+        return None
+
+    def update_one(self, filter, update):
+        self._round_trip()
+        with self._lock:
+            matched, modified = self._update(filter, update)
+        return UpdateResult({"n": matched, "nModified": modified}, True)
+
+    def delete_one(self, filter):
+        self._round_trip()
+        with self._lock:
+            deleted = self._delete(filter)
+        return DeleteResult({"n": deleted}, True)
+
+    def bulk_write(self, requests, ordered=True):
+        details = {
+            "writeErrors": [], "writeConcernErrors": [], "nInserted": 0,
+            "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0,
+            "upserted": [],
+        }
+        self._round_trip()
+        with self._lock:
+            for index, request in enumerate(requests):
+                try:
+                    if isinstance(request, InsertOne):
+                        self._insert(request._doc)
+                        details["nInserted"] += 1
+                    elif isinstance(request, UpdateOne):
+                        matched, modified = self._update(request._filter, request._doc)
+                        details["nMatched"] += matched
+                        details["nModified"] += modified
+                    elif isinstance(request, DeleteOne):
+                        details["nRemoved"] += self._delete(request._filter)
+                    else:
+                        raise TypeError(f"Unsupported bulk operation: {request!r}")
+                except DuplicateKeyError as e:
+                    details["writeErrors"].append({"index": index, "code": e.code, "errmsg": str(e)})
+                    if ordered:
+                        break
+        if details["writeErrors"]:
+            raise BulkWriteError(details)
+        return BulkWriteResult(details, True)
+
+    def _round_trip(self):
+        if self._latency:
+            time.sleep(self._latency)
+
+    def _store(self, document):
+        data = bson.encode(document)
+        self._docs[document["_id"]] = (bson.decode(data), data)
+
+    def _insert(self, document):
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        if document["_id"] in self._docs:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: _id_", 11000)
+        self._check_unique(document)
+        self._store(document)
+        self._index_unique(document)
+
+    def _update(self, filter, update):
+        unsupported = set(update) - {"$set"}
+        if unsupported:
+            raise OperationFailure(f"Unsupported update operators: {sorted(unsupported)}")
+        for stored, _ in self._docs.values():
+            if _matches(stored, filter):
+                updated = {**stored, **update.get("$set", {})}
+                self._check_unique(updated)
+                self._unindex_unique(stored)
+                self._store(updated)
+                self._index_unique(updated)
+                return 1, int(updated != stored)
+        return 0, 0
+
+    def _delete(self, filter):
+        for stored, _ in self._docs.values():
+            if _matches(stored, filter):
+                del self._docs[stored["_id"]]
+                self._unindex_unique(stored)
+                return 1
+        return 0
+
+    def _unique_entries(self, document):
+        for name, values in self._unique.items():
+            index = self._indexes[name]
+            partial = index.get("partialFilterExpression")
+            if partial and not _matches(document, partial):
+                continue
+            value = document.get(next(iter(index["key"])))
+            yield name, values, repr(value)
+
+    def _check_unique(self, document):
+        for name, values, key in self._unique_entries(document):
+            if values.get(key, document["_id"]) != document["_id"]:
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.name} index: {name}",
+                    11000,
+                )
+
+    def _index_unique(self, document):
+        for _, values, key in self._unique_entries(document):
+            values[key] = document["_id"]
+
+    def _unindex_unique(self, document):
+        for _, values, key in self._unique_entries(document):
+            values.pop(key, None)
+
+
+class FakeCursor:
+    def __init__(self, collection, filter, projection, raw_batches=False):
+        self._collection = collection
+        self._filter = filter
+        self._projection = projection
+        self._raw_batches = raw_batches
+        self._sort = None
+        self._limit = 0
+        self._batch_size = 0
+
+    def sort(self, key, direction=1):
+        self._sort = key if isinstance(key, list) else [(key, direction)]
+        return self
+
+    def hint(self, index):
+        if index not in self._collection._indexes:
+            raise OperationFailure("hint provided does not correspond to an existing index")
+        return self
+
+    def limit(self, limit):
+        self._limit = limit
+        return self
+
+    def batch_size(self, batch_size):
+        self._batch_size = batch_size
+        return self
+
+    def close(self):
+        pass
+
+    def __iter__(self):
+        self._collection._round_trip()
+        with self._collection._lock:
+            matches = [
+                (stored, data) for stored, data in self._collection._docs.values()
+                if _matches(stored, self._filter)
+            ]
+        for field, direction in reversed(self._sort or []):
+            matches.sort(key=lambda m: _sort_key(m[0].get(field)), reverse=direction == -1)
+        if self._limit:
+            matches = matches[:self._limit]
+        documents = [_project(bson.decode(data), self._projection) for _, data in matches]
+        if self._raw_batches:
+            # Like find_raw_batches: each batch is its documents' BSON, concatenated.
+            size = self._batch_size or 101
+            return (
+                b"".join(bson.encode(document) for document in documents[i:i + size])
+                for i in range(0, len(documents), size)
+            )
+        return iter(documents)
+
+
+class FakeAsyncClient:
+    """FakeClient behind the AsyncMongoClient API; the round trip is awaited"""
+
+    def __init__(self, host=None, **options):
+        self._client = FakeClient(host, **options)
+        self.options = self._client.options
+
+    def get_database(self, name):
+        return FakeAsyncDatabase(self._client.get_database(name))
+
+    @property
+    def admin(self):
+        return self.get_database("admin")
+
+    async def close(self):
+        pass
+
+
+class FakeAsyncDatabase:
+    def __init__(self, database):
+        self._database = database
+        self.name = database.name
+
+    def get_collection(self, name):
+        return FakeAsyncCollection(self._database.get_collection(name))
+
+    async def command(self, command, *args, **kwargs):
+        return self._database.command(command, *args, **kwargs)
+
+
+class FakeAsyncCollection:
+    def __init__(self, collection):
+        # Same documents and indexes, without the blocking round trip.
+        self._collection = copy.copy(collection)
+        self._collection._latency = 0
+        self.name = collection.name
+
+    async def create_indexes(self, indexes):
+        return self._collection.create_indexes(indexes)
+
+    async def insert_one(self, document):
+        await _round_trip()
+        return self._collection.insert_one(document)
+
+    def find(self, filter=None, projection=None):
+        return FakeAsyncCursor(self._collection.find(filter, projection))
+
+    def find_raw_batches(self, filter=None, projection=None):
+        return FakeAsyncCursor(self._collection.find_raw_batches(filter, projection))
+
+    async def find_one(self, filter=None, projection=None):
+        await _round_trip()
+        return self._collection.find_one(filter, projection)
+
+    async def update_one(self, filter, update):
+        await _round_trip()
+        return self._collection.update_one(filter, update)
+
+    async def delete_one(self, filter):
+        await _round_trip()
+        return self._collection.delete_one(filter)
+
+    async def bulk_write(self, requests, ordered=True):
+        await _round_trip()
+        return self._collection.bulk_write(requests, ordered=ordered)
+
+
+class FakeAsyncCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, key, direction=1):
+        self._cursor.sort(key, direction)
+        return self
+
+    def hint(self, index):
+        self._cursor.hint(index)
+        return self
+
+    def limit(self, limit):
+        self._cursor.limit(limit)
+        return self
+
+    def batch_size(self, batch_size):
+        self._cursor.batch_size(batch_size)
+        return self
+
+    async def close(self):
+        pass
+
+    async def __aiter__(self):
+        await _round_trip()
+        for item in self._cursor:
+            yield item
+
+
+async def _round_trip():
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+
+
+def _matches(document, filter):
+    for key, condition in filter.items():
+        if key == "$or":
+            if not any(_matches(document, sub) for sub in condition):
+                return False
+        elif key == "$and":
+            if not all(_matches(document, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+            value = document.get(key, _MISSING)
+            if not all(_operator(op, value, arg) for op, arg in condition.items()):
+                return False
+        elif document.get(key, _MISSING if condition is not None else None) != condition:
+            return False
+    return True
+
+
+def _operator(op, value, arg):
+    if op == "$exists":
+        return (value is not _MISSING) == arg
+    if op == "$ne":
+        return value != arg
+    if op == "$in":
+        return value in arg
+    if op == "$regex":
+        return isinstance(value, str) and re.search(arg, value) is not None
+    if value is _MISSING or value is None or type(value) is not type(arg):
+        return False
+    if op == "$gt":
+        return value > arg
+    if op == "$gte":
+        return value >= arg
+    if op == "$lt":
+        return value < arg
+    if op == "$lte":
+        return value <= arg
+    raise OperationFailure(f"Unsupported query operator: {op}")
+
+
+def _sort_key(value):
+    return (0, "") if value is None else (1, value)
+
+
+def _project(document, projection):
+    if not projection:
+        return document
+    if any(v for k, v in projection.items() if k != "_id"):
+        keep = {k for k, v in projection.items() if v}
+        if projection.get("_id", 1):
+            keep.add("_id")
+        return {k: v for k, v in document.items() if k in keep}
+    return {k: v for k, v in document.items() if projection.get(k, 1)}
@@ -0,0 +1,103 @@
+"""In-process stand-in for Redis, for the shared task cache.
+
+Implements the commands task_cache.SharedTaskCache sends (GET, INCR,
+HGET, HSET, EXPIRE, DELETE, and pipelines of them) with redis-py's
+return values, including key expiry. Values come back as bytes, as they
+do from redis-py by default.
+
+install() makes task_cache.from_env() build a SharedTaskCache on one
+FakeRedis, so every lambda_function imported afterwards shares it the way
+Lambda containers share a Redis server (see dev_server.py --fake-redis).
+"""
+import threading
+import time
+
+
+def install():
+    """Point task_cache at one FakeRedis; import lambda_function after this"""
+    import os
+    # Before task_cache is imported: its TTL default depends on the URL.
+    os.environ.setdefault("TASK_CACHE_REDIS_URL", "redis://fake")
+    import task_cache
+
+    client = FakeRedis()
+    task_cache.connect = lambda url: client
+    return client
+
+
+class FakeRedis:
+    def __init__(self):
+        # key -> (value, expires or None); value is bytes or {field: bytes}
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def get(self, name):
+        with self._lock:
+            return self._value(name)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            value = int(self._value(name) or 0) + amount
+            self._data[name] = (str(value).encode(), self._expiry(name))
+            return value
+
+    def hget(self, name, key):
+        with self._lock:
+            return (self._value(name) or {}).get(key)
+
+    def hset(self, name, key, value):
+        with self._lock:
+            fields = self._value(name)
+            if fields is None:
+                fields = {}
+                self._data[name] = (fields, None)
+            added = key not in fields
+            fields[key] = value.encode() if isinstance(value, str) else value
+            return int(added)
+
+    def expire(self, name, seconds):
+        with self._lock:
+            value = self._value(name)
+            if value is None:
+                return False
+            self._data[name] = (value, time.time() + seconds)
+            return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(self._data.pop(name, None) is not None for name in names)
+
+    def _value(self, name):
+        entry = self._data.get(name)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires <= time.time():
+            del self._data[name]
+            return None
+        return value
+
+    def _expiry(self, name):
+        entry = self._data.get(name)
+        return entry[1] if entry else None
+
+
+class FakePipeline:
+    """Queues commands and runs them together on execute(), like redis-py"""
+
+    def __init__(self, client):
+        self._client = client
+        self._commands = []
+
+    def __getattr__(self, command):
+        def queue(*args, **kwargs):
+            self._commands.append((command, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        commands, self._commands = self._commands, []
+        return [getattr(self._client, command)(*args, **kwargs) for command, args, kwargs in commands]
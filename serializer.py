@@ -0,0 +1,47 @@
+"""JSON encoding and decoding for request and response bodies.
+
+Uses orjson when it is installed and the standard library otherwise (set
+JSON_BACKEND=json to force it). Both backends write the same compact,
+UTF-8 text, and both encode datetime values as ISO 8601 and ObjectId as
+its hex string, so documents read from Mongo can be encoded as they are.
+See benchmarks/json_backends.py.
+"""
+import json
+import os
+from datetime import datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value):
+    """Encode the non-JSON types found in stored documents"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    # Only reached for values that came out of bson, so it is loaded already.
+    from bson import ObjectId
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+_encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=_default)
+
+def _json_dumps(value) -> str:
+    return _encoder.encode(value)
+
+def _orjson_dumps(value) -> str:
+    # orjson encodes datetime itself; _default only sees ObjectId.
+    return orjson.dumps(value, default=_default).decode("utf-8")
+
+# Backend name -> (loads, dumps)
+BACKENDS = {"json": (json.loads, _json_dumps)}
+if orjson is not None:
+    BACKENDS["orjson"] = (orjson.loads, _orjson_dumps)
+
+BACKEND = os.getenv("JSON_BACKEND") or ("orjson" if orjson is not None else "json")
+if BACKEND not in BACKENDS:
+    raise ValueError(f"JSON_BACKEND must be one of {', '.join(BACKENDS)}, not {BACKEND!r}")
+
+# loads raises a ValueError subclass on malformed input with either backend.
+loads, dumps = BACKENDS[BACKEND]
@@ -0,0 +1,71 @@
+"""Long-running HTTP service, for container deployments (ECS, Kubernetes).
+
+Serves an ASGI application, by default async_handler.app (the routes of
+lambda_function.lambda_handler), with uvicorn (pip install "uvicorn[standard]") from
+WEB_CONCURRENCY worker processes. Each worker imports the app itself, after
+it starts (nothing is preloaded in the parent), so it has its own
+AsyncMongoClient whose pool (MONGO_MAX_POOL_SIZE per worker, default 100)
+every request in that worker shares; a client is never carried across
+processes. uvicorn's parent restarts a worker that dies, and on SIGTERM
+or SIGINT the workers stop accepting, finish the requests in flight (up to
+SHUTDOWN_TIMEOUT seconds) and close their clients through the app's
+lifespan shutdown.
+
+    python server.py [--workers N] [--host H] [--port P] [--app module:attr] [--access-log]
+
+WEB_CONCURRENCY defaults to the CPUs the process may run on (set it to
+the task's vCPUs when a CPU quota rather than a cpuset limits it), HOST to
+0.0.0.0 and PORT to 8080. GET /health answers 200 without touching
+MongoDB, for load balancer and orchestrator health checks (see
+async_handler.app).
+"""
+import argparse
+import os
+
+
+def cpu_count():
+    """CPUs this process may run on (a container's cpuset, not the host's)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(cpu_count())))
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8080"))
+# Seconds a stopping worker waits for the requests it is serving.
+SHUTDOWN_TIMEOUT = float(os.getenv("SHUTDOWN_TIMEOUT", "10"))
+# Seconds a keep-alive connection may wait for its next request; longer
+# than a load balancer's idle timeout (60 s on an ALB), so it closes first.
+KEEPALIVE_TIMEOUT = float(os.getenv("KEEPALIVE_TIMEOUT", "75"))
+
+
+def run(app="async_handler:app", host=HOST, port=PORT, workers=WEB_CONCURRENCY, access_log=False):
+    """Serve app, a module:attribute string or (with one worker) an ASGI app, until SIGTERM or SIGINT"""
+    import uvicorn
+
+    uvicorn.run(
+        app,
+        host=host,
+        port=port,
+        workers=workers if workers > 1 else None,
+        lifespan="on",
+        timeout_keep_alive=KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=SHUTDOWN_TIMEOUT,
+        access_log=access_log,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY, help="worker processes")
+    parser.add_argument("--app", default="async_handler:app", help="module:attribute of the ASGI app")
+    parser.add_argument("--access-log", action="store_true", help="print a line per request")
+    args = parser.parse_args()
+    run(args.app, args.host, args.port, args.workers, args.access_log)
+
+
+if __name__ == "__main__":
+    main()
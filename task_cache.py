@@ -0,0 +1,186 @@
+"""Read-through cache of GET /tasks pages, per user.
+
+Users reload their task list far more often than they change it, so the
+encoded pages (the JSON body and the next-page cursor) are kept for
+TASK_CACHE_TTL seconds, keyed by the user and the request's query string.
+Every write a user makes (add, update, delete, batch) invalidates all of
+their pages. It also bumps the user's generation number, and a page is
+stored with the generation it was looked up under, so a page read from
+MongoDB before a write landed is never served after it.
+
+Two stores, picked by from_env():
+
+    LocalTaskCache    this container's memory: least recently used users
+                      are evicted past TASK_CACHE_BYTES of page bodies.
+                      Another container's writes are not seen here until
+                      the TTL runs out, so it is only used when
+                      TASK_CACHE_TTL is set.
+    SharedTaskCache   a Redis server (TASK_CACHE_REDIS_URL, needs the redis
+                      package) that every container reads and invalidates,
+                      so they agree. The TTL defaults to 10 seconds with
+                      it. scripts/fake_redis.py stands in for it locally.
+
+Hits and misses are counted in the invocation's metrics (see metrics.py).
+A shared store that cannot be reached counts as a miss.
+"""
+import itertools
+import os
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+import metrics
+
+# Off unless a shared store is configured: a page cached in one container
+# can be served after a write made through another.
+TTL = float(os.getenv("TASK_CACHE_TTL", "10" if os.getenv("TASK_CACHE_REDIS_URL") else "0"))
+# Page bodies kept by LocalTaskCache, in characters (about bytes: task JSON
+# is mostly ASCII).
+MAX_BYTES = int(os.getenv("TASK_CACHE_BYTES", str(16 * 1024 * 1024)))
+
+def from_env():
+    """The cache the environment configures, or None with TASK_CACHE_TTL=0"""
+    if TTL <= 0:
+        return None
+    url = os.getenv("TASK_CACHE_REDIS_URL")
+    if url:
+        return SharedTaskCache(connect(url))
+    return LocalTaskCache()
+
+def connect(url):
+    """A Redis client for url; replaced by scripts/fake_redis.py for local runs"""
+    import redis
+    return redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+def page_key(params) -> str:
+    """Cache key of a GET /tasks request's query string parameters"""
+    return urlencode(sorted((params or {}).items()))
+
+# LocalTaskCache generations, drawn from one counter so that a user who is
+# evicted and comes back never gets a generation a read in flight holds.
+_generations = itertools.count(1)
+
+class LocalTaskCache:
+    """Pages held in this process, least recently used users evicted first"""
+
+    shared = False
+
+    def __init__(self, ttl: float = TTL, max_bytes: int = MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size = 0
+        # user id -> {"generation": n, page key: (generation, expires, body, next_cursor)}
+        self._users = OrderedDict()
+
+    def lookup(self, user_id: str, key: str):
+        """Returns (page, generation): page is (body, next_cursor) or None.
+
+        On a miss, pass generation to store() along with the page fetched.
+        """
+        pages = self._users.get(user_id)
+        if pages is None:
+            pages = self._users[user_id] = {"generation": next(_generations)}
+        else:
+            self._users.move_to_end(user_id)
+        entry = pages.get(key)
+        generation = pages["generation"]
+        if entry is None or entry[0] != generation or entry[1] <= time.time():
+            metrics.record_cache(hit=False)
+            return None, generation
+        metrics.record_cache(hit=True)
+        return entry[2:], generation
+
+    def store(self, user_id: str, key: str, generation: int, page):
+        pages = self._users.get(user_id)
+        if pages is None or pages["generation"] != generation:
+            # Invalidated, or evicted (and so possibly invalidated), since
+            # the lookup.
+            return
+        body, next_cursor = page
+        old = pages.get(key)
+        if old is not None:
+            self.size -= len(old[2])
+        pages[key] = (generation, time.time() + self.ttl, body, next_cursor)
+        self.size += len(body)
+        self._users.move_to_end(user_id)
+        while self.size > self.max_bytes and self._users:
+            _, evicted = self._users.popitem(last=False)
+            self.size -= sum(len(entry[2]) for name, entry in evicted.items() if name != "generation")
+
+    def invalidate(self, user_id: str):
+        """Drop user_id's pages after a write of theirs"""
+        pages = self._users.get(user_id)
+        if pages is None:
+            # A read in flight for them finds no entry to store under.
+            return
+        self.size -= sum(len(entry[2]) for name, entry in pages.items() if name != "generation")
+        self._users[user_id] = {"generation": next(_generations)}
+
+class SharedTaskCache:
+    """Pages in Redis: a hash of each user's pages, and their generation beside it"""
+
+    shared = True
+
+    def __init__(self, client, ttl: float = TTL):
+        self.client = client
+        self.ttl = ttl
+
+    def lookup(self, user_id: str, key: str):
+        """LocalTaskCache.lookup, in one round trip"""
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.get(self._generation(user_id))
+        pipeline.hget(self._pages(user_id), key)
+        try:
+            generation, entry = pipeline.execute()
+        except Exception as e:
+            metrics.log_error("Error reading task cache", e)
+            metrics.record_cache(hit=False)
+            return None, None
+        generation = int(generation or 0)
+        if entry is not None:
+            if isinstance(entry, bytes):
+                entry = entry.decode("utf-8")
+            header, _, body = entry.partition("\n")
+            stored_generation, expires, next_cursor = header.split(" ")
+            if int(stored_generation) == generation and float(expires) > time.time():
+                metrics.record_cache(hit=True)
+                return (body, next_cursor or None), generation
+        metrics.record_cache(hit=False)
+        return None, generation
+
+    def store(self, user_id: str, key: str, generation, page):
+        if generation is None:
+            return
+        body, next_cursor = page
+        pages = self._pages(user_id)
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.hset(pages, key, f"{generation} {time.time() + self.ttl} {next_cursor or ''}\n{body}")
+        pipeline.expire(pages, self._expiry())
+        try:
+            pipeline.execute()
+        except Exception as e:
+            metrics.log_error("Error writing task cache", e)
+
+    def invalidate(self, user_id: str):
+        # The generation key lives a TTL past the last write, longer than
+        # any read that could still store a page under an older one.
+        generation = self._generation(user_id)
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.incr(generation)
+        pipeline.expire(generation, self._expiry())
+        pipeline.delete(self._pages(user_id))
+        try:
+            pipeline.execute()
+        except Exception as e:
+            metrics.log_error("Error invalidating task cache", e)
+
+    def _expiry(self) -> int:
+        return int(self.ttl) + 1
+
+    @staticmethod
+    def _pages(user_id: str) -> str:
+        return f"task-manager:pages:{user_id}"
+
+    @staticmethod
+    def _generation(user_id: str) -> str:
+        return f"task-manager:generation:{user_id}"
@@ -0,0 +1,137 @@
+"""Query builder for GET tasks.
+
+Turns query string parameters into a MongoDB filter, sort and index hint,
+and refuses combinations that no index in db.INDEXES can serve, so every
+page is an index range scan.
+"""
+import base64
+import binascii
+import re
+import struct
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+EPOCH = datetime(1970, 1, 1)
+
+SORT_FIELDS = ("createdAt", "title")
+MAX_STATUS_LENGTH = 32
+MAX_TITLE_PREFIX_LENGTH = 200
+
+def build_task_query(params: dict, user_id: str):
+    """Build the find() arguments for one page of a user's tasks.
+
+    Supported parameters: status, createdFrom/createdTo (ISO 8601, from is
+    inclusive and to exclusive), titlePrefix, sort (createdAt, -createdAt,
+    title or -title) and next (page cursor). Returns (spec, error) where
+    spec holds "filter", "sort", "hint" and "sort_field".
+    """
+    sort = params.get("sort") or "createdAt"
+    direction = -1 if sort.startswith("-") else 1
+    sort_field = sort.lstrip("-")
+    if sort_field not in SORT_FIELDS:
+        return None, "sort must be one of createdAt, -createdAt, title, -title"
+
+    status = params.get("status")
+    if status is not None and len(status) > MAX_STATUS_LENGTH:
+        return None, f"status must be at most {MAX_STATUS_LENGTH} characters"
+
+    created = {}
+    for param, operator in (("createdFrom", "$gte"), ("createdTo", "$lt")):
+        if params.get(param):
+            value = parse_datetime(params[param])
+            if value is None:
+                return None, f"{param} must be an ISO 8601 date or datetime"
+            created[operator] = value
+
+    title_prefix = params.get("titlePrefix")
+    if title_prefix is not None and len(title_prefix) > MAX_TITLE_PREFIX_LENGTH:
+        return None, f"titlePrefix must be at most {MAX_TITLE_PREFIX_LENGTH} characters"
+
+    query = {"owner_id": user_id}
+    if sort_field == "createdAt":
+        if title_prefix is not None:
+            return None, "titlePrefix can only be combined with sort=title or sort=-title"
+        if status is not None:
+            query["status"] = status
+            hint = "owner_id_status_createdAt"
+        else:
+            hint = "owner_id_createdAt"
+        if created:
+            query["createdAt"] = created
+    else:
+        if status is not None or created:
+            return None, "status, createdFrom and createdTo can only be combined with sort=createdAt or sort=-createdAt"
+        # An anchored, escaped regex is a range scan on the title index.
+        # Without a prefix, matching every string keeps the scan on strings
+        # only, which the page cursor relies on.
+        if title_prefix:
+            query["title"] = {"$regex": "^" + re.escape(title_prefix)}
+        else:
+            query["title"] = {"$gte": ""}
+        hint = "owner_id_title"
+
+    if params.get("next"):
+        position = decode_cursor(params["next"], sort_field)
+        if position is None:
+            return None, "Invalid cursor"
+        last_value, last_id = position
+        operator = "$gt" if direction == 1 else "$lt"
+        query["$or"] = [
+            {sort_field: {operator: last_value}},
+            {sort_field: last_value, "_id": {operator: last_id}}
+        ]
+
+    return {
+        "filter": query,
+        "sort": [(sort_field, direction), ("_id", direction)],
+        "hint": hint,
+        "sort_field": sort_field
+    }, None
+
+def parse_datetime(value: str):
+    """Parse an ISO 8601 date or datetime into naive UTC, or None if it is malformed"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def encode_cursor(last_value, last_id: ObjectId) -> str:
+    """Opaque page token wrapping the sort key of the last task of a page"""
+    if isinstance(last_value, datetime):
+        millis = (last_value - EPOCH) // timedelta(milliseconds=1)
+        key = b"d" + struct.pack(">q", millis)
+    else:
+        key = b"s" + last_value.encode("utf-8")
+    return base64.urlsafe_b64encode(last_id.binary + key).decode("ascii")
+
+def decode_cursor(token: str, sort_field: str):
+    """Return the (sort value, _id) held in a page token, or None if it is
+    malformed or was issued for another sort field"""
+    try:
+        raw = base64.urlsafe_b64decode(token.encode("ascii"))
+    except (binascii.Error, ValueError):
+        return None
+    last_id, kind, key = raw[:12], raw[12:13], raw[13:]
+    if len(last_id) != 12:
+        return None
+
+    if sort_field == "createdAt":
+        if kind != b"d" or len(key) != 8:
+            return None
+        millis = struct.unpack(">q", key)[0]
+        try:
+            last_value = EPOCH + timedelta(milliseconds=millis)
+        except OverflowError:
+            return None
+    else:
+        if kind != b"s":
+            return None
+        try:
+            last_value = key.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+    return last_value, ObjectId(last_id)
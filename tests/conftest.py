@@ -0,0 +1,60 @@
+"""Shared fixtures: the handlers, run against scripts/fake_mongo.py.
+
+No MongoDB server is needed. Each test gets empty fake collections, and
+the `api` fixture runs it once through lambda_function.lambda_handler and
+once through async_handler.lambda_handler.
+"""
+import importlib
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("PASSWORD_HASH_COST", "10")
+os.environ.setdefault("METRICS_LOG", "off")
+
+import fake_mongo  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fake_db():
+    """Fresh, empty fake collections, with db.py's indexes declared on them"""
+    return fake_mongo.install()
+
+
+class Api:
+    """Calls one handler module's lambda_handler with API Gateway proxy events"""
+
+    def __init__(self, module):
+        self.module = module
+        self.token = None
+
+    def call(self, method, path, body=None, params=None):
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        event = {
+            "httpMethod": method,
+            "path": path,
+            "headers": headers,
+            "queryStringParameters": params,
+            "body": json.dumps(body) if body is not None else None,
+        }
+        response = self.module.lambda_handler(event, None)
+        return response["statusCode"], json.loads(response["body"]), response["headers"]
+
+    def sign_up(self, email="user@example.com", password="password"):
+        status, body, _ = self.call("POST", "/register", {"email": email, "password": password})
+        assert status == 201, body
+        self.token = body["token"]
+        return self
+
+
+@pytest.fixture(params=["lambda_function", "async_handler"])
+def api(request):
+    """A signed-up user's client of one of the two handlers"""
+    return Api(importlib.import_module(request.param)).sign_up()
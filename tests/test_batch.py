@@ -0,0 +1,113 @@
+"""POST /tasks/batch: planning, replay of missing tasks and write errors."""
+import pytest
+
+import lambda_function
+from lambda_function import MAX_BATCH_SIZE, batch_response, plan_batch
+
+
+def create(task_id, title="title"):
+    return {"action": "create", "task": {"id": task_id, "title": title}}
+
+
+def update(task_id, title="updated"):
+    return {"action": "update", "task": {"id": task_id, "title": title}}
+
+
+def delete(task_id):
+    return {"action": "delete", "task": {"id": task_id}}
+
+
+def run(api, *operations):
+    status, body, _ = api.call("POST", "/tasks/batch", {"operations": list(operations)})
+    assert status == 200, body
+    counts = {name: body[name] for name in ("inserted", "matched", "modified", "deleted")}
+    return [(result["status"], result.get("error")) for result in body["results"]], counts
+
+
+def titles(api):
+    return {task["id"]: task["title"] for task in api.call("GET", "/tasks", params={"fields": "id,title"})[1]}
+
+
+def test_create_delete_update_of_one_task(api):
+    results, counts = run(api, create("a"), update("a", "b"), delete("a"), update("a", "c"))
+    assert results == [(201, None), (200, None), (200, None), (404, "Task not found")]
+    assert counts == {"inserted": 1, "matched": 1, "modified": 1, "deleted": 1}
+    assert titles(api) == {}
+
+
+def test_missing_tasks_are_404_and_not_sent(api):
+    results, counts = run(api, delete("nope"), update("nope either"))
+    assert results == [(404, "Task not found"), (404, "Task not found")]
+    assert counts == {"inserted": 0, "matched": 0, "modified": 0, "deleted": 0}
+
+
+def test_delete_then_recreate(api):
+    run(api, create("a", "first"))
+    results, counts = run(api, delete("a"), update("a"), create("a", "second"), update("a", "third"))
+    assert results == [(200, None), (404, "Task not found"), (201, None), (200, None)]
+    assert counts == {"inserted": 1, "matched": 1, "modified": 1, "deleted": 1}
+    assert titles(api) == {"a": "third"}
+
+
+def test_another_users_tasks_are_missing(api):
+    owner = type(api)(api.module).sign_up("owner@example.com")
+    run(owner, create("theirs", "kept"))
+    results, _ = run(api, update("theirs"), delete("theirs"))
+    assert results == [(404, "Task not found"), (404, "Task not found")]
+    assert titles(owner) == {"theirs": "kept"}
+
+
+def test_ordered_batch_stops_at_a_duplicate(api):
+    run(api, create("a"))
+    results, counts = run(api, create("a"), update("a"), create("b"))
+    assert results == [
+        (400, "Task ID already exists"),
+        (400, "Not applied after an earlier error"),
+        (400, "Not applied after an earlier error"),
+    ]
+    assert counts["inserted"] == counts["matched"] == 0
+
+
+def test_unordered_batch_goes_past_a_duplicate(api):
+    run(api, create("a"))
+    # Distinct task ids: the write is unordered.
+    results, counts = run(api, create("a"), create("c"))
+    assert results == [(400, "Task ID already exists"), (201, None)]
+    assert counts["inserted"] == 1
+    assert set(titles(api)) == {"a", "c"}
+
+
+def test_invalid_operations_are_reported_and_the_rest_applied(api):
+    results, counts = run(
+        api,
+        {"action": "rename", "task": {"id": "a"}},
+        {"action": "create"},
+        {"action": "update", "task": {"title": "no id"}},
+        {"action": "create", "task": {"title": "x" * 201}},
+        {"action": "delete", "task": {"id": {"$ne": None}}},
+        create("ok"),
+    )
+    assert [status for status, _ in results] == [400, 400, 400, 400, 400, 201]
+    assert results[2] == (400, "Task ID is required")
+    assert counts["inserted"] == 1
+    assert titles(api) == {"ok": "title"}
+
+
+@pytest.mark.parametrize("operations", [None, [], "create", [create(str(n)) for n in range(MAX_BATCH_SIZE + 1)]])
+def test_invalid_batches(api, operations):
+    status, body, _ = api.call("POST", "/tasks/batch", {"operations": operations})
+    assert (status, body) == (400, {"error": f"operations must be a list of 1 to {MAX_BATCH_SIZE} items"})
+
+
+def test_write_errors_map_to_their_operations():
+    batch, _ = plan_batch({"operations": [delete("x"), create("a"), create("b"), create("c")]}, "user")
+    assert not batch["ordered"]
+    details = {
+        "writeErrors": [{"index": 1, "code": 11000}, {"index": 3, "code": 2}],
+        "nInserted": 1, "nMatched": 0, "nModified": 0, "nRemoved": 1,
+    }
+    body = lambda_function.serializer.loads(batch_response(batch, details)["body"])
+    assert [(result["status"], result.get("error")) for result in body["results"]] == [
+        (200, None), (400, "Task ID already exists"), (201, None), (400, "Error applying operation"),
+    ]
+    assert (body["inserted"], body["deleted"]) == (1, 1)
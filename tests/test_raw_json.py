@@ -0,0 +1,100 @@
+"""raw_json.write_page must write the text serializer.dumps would."""
+import io
+import random
+from datetime import datetime, timedelta
+
+import bson
+import pytest
+from bson import ObjectId
+
+import raw_json
+import serializer
+
+FIELDS = ("id", "title", "description", "status", "createdAt", "owner_id", "_id", "count", "big", "done", "none")
+
+STRINGS = [
+    "", "plain", "quote \" and backslash \\", "slash / stays", "tab\tnewline\ncr\r",
+    "control \x00\x01\x1f\x7f", "é ñ ü", "日本語", "emoji 😀 🎉", "  ", "<script>&amp;",
+]
+
+
+def random_string(rng):
+    if rng.random() < 0.5:
+        return rng.choice(STRINGS)
+    return "".join(chr(rng.choice([rng.randrange(0x20), rng.randrange(0x20, 0x7f), rng.randrange(0x80, 0xd800), rng.randrange(0xe000, 0x110000)])) for _ in range(rng.randrange(12)))
+
+
+def random_task(rng):
+    """A task with the value types stored tasks hold, and a few the extension leaves to Python"""
+    created = datetime(1969, 12, 31) + timedelta(milliseconds=rng.randrange(-10**12, 2 * 10**12))
+    values = {
+        "id": random_string(rng),
+        "title": random_string(rng),
+        "description": random_string(rng),
+        "status": rng.choice(["todo", "done", random_string(rng)]),
+        "createdAt": created,
+        "owner_id": str(ObjectId()),
+        "_id": ObjectId(),
+        "count": rng.randrange(-2**31, 2**31),
+        "big": rng.randrange(-2**63, 2**63),
+        "done": rng.random() < 0.5,
+        "none": None,
+    }
+    if rng.random() < 0.1:
+        values["count"] = rng.random() * 1000  # a double: left to Python
+    if rng.random() < 0.1:
+        values["description"] = {"nested": random_string(rng)}
+    return {name: value for name, value in values.items() if rng.random() < 0.9}
+
+
+def expected_page(tasks, fields):
+    return ",".join(serializer.dumps({field: task[field] for field in fields if field in task}) for task in tasks)
+
+
+def batches_of(tasks, size):
+    return [b"".join(bson.encode(task) for task in tasks[start:start + size]) for start in range(0, len(tasks), size)]
+
+
+@pytest.fixture(params=sorted(serializer.BACKENDS))
+def backend(request, monkeypatch):
+    """serializer.dumps switched to each JSON backend installed"""
+    monkeypatch.setattr(serializer, "dumps", serializer.BACKENDS[request.param][1])
+    return request.param
+
+
+@pytest.fixture(params=["c", "python"])
+def encoder(request, monkeypatch):
+    """write_page with the C extension, and without it"""
+    if request.param == "c" and not raw_json.has_c():
+        pytest.skip("_raw_json is not built (scripts/build_extensions.py)")
+    if request.param == "python":
+        monkeypatch.setattr(raw_json, "_documents_to_json", None)
+    return request.param
+
+
+def test_write_page_matches_serializer(backend, encoder):
+    rng = random.Random(20261018)
+    for _ in range(200):
+        tasks = [bson.decode(bson.encode(random_task(rng))) for _ in range(rng.randrange(1, 8))]
+        fields = tuple(rng.sample(FIELDS, rng.randrange(1, len(FIELDS) + 1)))
+        out = io.StringIO()
+        count, _, more = raw_json.write_page(out, batches_of(tasks, rng.randrange(1, 4)), fields, len(tasks))
+        assert (count, more) == (len(tasks), False)
+        assert out.getvalue() == expected_page(tasks, fields)
+
+
+def test_write_page_stops_at_limit(encoder):
+    tasks = [{"id": str(number), "title": f"task {number}"} for number in range(5)]
+    out = io.StringIO()
+    count, last, more = raw_json.write_page(out, batches_of(tasks, 2), ("id",), 3)
+    assert (count, more) == (3, True)
+    assert bson.decode(last) == tasks[2]
+    assert out.getvalue() == '{"id":"0"},{"id":"1"},{"id":"2"}'
+
+
+def test_write_page_with_more_fields_than_the_extension_takes(encoder):
+    task = {f"f{number}": number for number in range(raw_json.MAX_FIELDS + 8)}
+    out = io.StringIO()
+    count, _, _ = raw_json.write_page(out, batches_of([task], 1), tuple(task), 1)
+    assert count == 1
+    assert out.getvalue() == serializer.dumps(task)
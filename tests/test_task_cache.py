@@ -0,0 +1,98 @@
+"""task_cache: hits, TTLs, and invalidation racing reads in flight."""
+import pytest
+
+import lambda_function
+import task_cache
+from fake_redis import FakeRedis
+from task_cache import LocalTaskCache, SharedTaskCache
+
+PAGE = ('[{"id":"1"}]', None)
+
+
+@pytest.fixture(params=["local", "shared"])
+def cache(request):
+    if request.param == "local":
+        return LocalTaskCache(ttl=60)
+    return SharedTaskCache(FakeRedis(), ttl=60)
+
+
+def fill(cache, user_id="user", key="k", page=PAGE):
+    _, generation = cache.lookup(user_id, key)
+    cache.store(user_id, key, generation, page)
+
+
+def test_stored_page_is_a_hit(cache):
+    fill(cache)
+    assert cache.lookup("user", "k")[0] == PAGE
+    assert cache.lookup("user", "other")[0] is None
+    assert cache.lookup("someone else", "k")[0] is None
+
+
+def test_invalidate_drops_the_users_pages(cache):
+    fill(cache, key="a")
+    fill(cache, key="b")
+    fill(cache, user_id="other")
+    cache.invalidate("user")
+    assert cache.lookup("user", "a")[0] is None
+    assert cache.lookup("user", "b")[0] is None
+    assert cache.lookup("other", "k")[0] == PAGE
+
+
+@pytest.mark.parametrize("known", [True, False])
+def test_page_read_before_a_write_is_not_stored_after_it(cache, known):
+    if known:
+        fill(cache, key="warm")
+    _, generation = cache.lookup("user", "k")
+    cache.invalidate("user")
+    cache.store("user", "k", generation, ("stale", None))
+    assert cache.lookup("user", "k")[0] is None
+
+
+def test_pages_expire(cache, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr(task_cache.time, "time", lambda: now)
+    fill(cache)
+    now += 59
+    assert cache.lookup("user", "k")[0] == PAGE
+    now += 2
+    assert cache.lookup("user", "k")[0] is None
+
+
+def test_evicted_user_never_gets_a_generation_back():
+    cache = LocalTaskCache(ttl=60, max_bytes=20)
+    _, generation = cache.lookup("user", "k")
+    cache.invalidate("user")
+    fill(cache, user_id="other", page=("x" * 21, None))
+    assert "user" not in cache._users
+
+    cache.store("user", "k", generation, ("stale", None))
+    page, new_generation = cache.lookup("user", "k")
+    assert page is None
+    assert new_generation != generation
+    cache.store("user", "k", new_generation, PAGE)
+    assert cache.lookup("user", "k")[0] == PAGE
+
+
+def test_local_size_follows_evictions_and_invalidations():
+    cache = LocalTaskCache(ttl=60, max_bytes=10)
+    fill(cache, user_id="a", page=("12345", None))
+    fill(cache, user_id="b", page=("1234", None))
+    assert cache.size == 9
+    fill(cache, user_id="c", page=("123", None))
+    assert "a" not in cache._users and cache.size == 7
+    cache.invalidate("b")
+    assert cache.size == 3
+
+
+def test_handlers_read_their_own_writes(api, monkeypatch):
+    cache = LocalTaskCache(ttl=60)
+    monkeypatch.setattr(lambda_function, "_task_cache", cache)
+    api.call("POST", "/tasks", {"id": "1", "title": "one"})
+    first = api.call("GET", "/tasks", params={"fields": "id,title"})[1]
+    assert cache.size == len('[{"id":"1","title":"one"}]')
+    assert api.call("GET", "/tasks", params={"fields": "id,title"})[1] == first
+
+    api.call("PUT", "/tasks", {"id": "1", "title": "uno"})
+    assert api.call("GET", "/tasks", params={"fields": "id,title"})[1] == [{"id": "1", "title": "uno"}]
+    api.call("POST", "/tasks/batch", {"operations": [{"action": "delete", "task": {"id": "1"}}]})
+    assert api.call("GET", "/tasks", params={"fields": "id,title"})[1] == []
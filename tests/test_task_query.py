@@ -0,0 +1,94 @@
+"""GET /tasks page cursors, paging and index hints."""
+import base64
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+import lambda_function
+from task_query import decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("value", [
+    datetime(2026, 10, 18, 17, 54, 35, 487000),
+    datetime(1969, 12, 31, 23, 59, 59, 999000),
+    datetime(1, 1, 1),
+    datetime(9999, 12, 31, 23, 59, 59, 999000),
+])
+def test_created_at_cursor_round_trip(value):
+    last_id = ObjectId()
+    assert decode_cursor(encode_cursor(value, last_id), "createdAt") == (value, last_id)
+
+
+@pytest.mark.parametrize("value", ["", "title", "é 日本語 😀", "a" * 200])
+def test_title_cursor_round_trip(value):
+    last_id = ObjectId()
+    assert decode_cursor(encode_cursor(value, last_id), "title") == (value, last_id)
+
+
+def test_cursor_is_tied_to_its_sort_field():
+    assert decode_cursor(encode_cursor(datetime(2026, 1, 1), ObjectId()), "title") is None
+    assert decode_cursor(encode_cursor("title", ObjectId()), "createdAt") is None
+
+
+def token(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+@pytest.mark.parametrize("bad", [
+    "",
+    "not base64!",
+    "é",
+    token(b"short"),
+    token(ObjectId().binary),
+    token(ObjectId().binary + b"d" + b"\x00" * 7),
+    token(ObjectId().binary + b"d" + b"\x7f" * 8),
+    token(ObjectId().binary + b"x" + b"\x00" * 8),
+])
+def test_bad_created_at_cursors(bad):
+    assert decode_cursor(bad, "createdAt") is None
+
+
+@pytest.mark.parametrize("bad", [
+    token(ObjectId().binary + b"d" + b"\x00" * 8),
+    token(ObjectId().binary + b"s\xff\xfe"),
+])
+def test_bad_title_cursors(bad):
+    assert decode_cursor(bad, "title") is None
+
+
+@pytest.mark.parametrize("sort", ["createdAt", "-createdAt", "title", "-title"])
+def test_pages_cover_every_task_once_in_order(api, sort):
+    for number in range(7):
+        api.call("POST", "/tasks", {"id": str(number), "title": f"task {number % 3} {number}"})
+
+    seen = []
+    params = {"sort": sort, "limit": "3", "fields": "id,title,createdAt"}
+    while True:
+        status, page, headers = api.call("GET", "/tasks", params=params)
+        assert status == 200
+        seen += page
+        if "X-Next-Cursor" not in headers:
+            break
+        params = {**params, "next": headers["X-Next-Cursor"]}
+
+    field = sort.lstrip("-")
+    expected = sorted(seen, key=lambda task: task[field], reverse=sort.startswith("-"))
+    assert [task["id"] for task in seen] == [task["id"] for task in expected]
+    assert sorted(task["id"] for task in seen) == [str(number) for number in range(7)]
+
+
+def test_bad_cursor_is_a_400(api):
+    status, body, _ = api.call("GET", "/tasks", params={"next": "not a cursor"})
+    assert (status, body) == (400, {"error": "Invalid cursor"})
+
+
+def test_missing_index_is_retried_without_its_hint(api, fake_db, monkeypatch):
+    monkeypatch.setattr(lambda_function, "_missing_hints", set())
+    api.call("POST", "/tasks", {"id": "1", "title": "one"})
+    fake_db.tasks_collection._indexes.pop("owner_id_createdAt")
+
+    for _ in range(2):
+        status, page, _ = api.call("GET", "/tasks", params={"fields": "id"})
+        assert (status, page) == (200, [{"id": "1"}])
+    assert lambda_function._missing_hints == {"owner_id_createdAt"}